@@ -46,6 +46,9 @@ async def main() -> None:
             # ) as file:
             #     file.write(logs)
 
+            # stream CSV logs to file without buffering them in memory
+            # await nextdns.download_logs_to(profile_id, f"nextdns_{profile_id}.csv")
+
             # enable block page
             # await nextdns.set_setting(profile_id, "block_page", True)
         except ValueError as error:
@@ -0,0 +1,62 @@
+"""Cache for NextDNS API wrapper."""
+
+from collections import OrderedDict
+from math import inf
+from time import monotonic
+from typing import Any
+
+
+class TtlCache:
+    """Least recently used cache with time to live of entries."""
+
+    def __init__(self, ttl: float | None, maxsize: int) -> None:
+        """Initialize cache, entries never expire when ttl is None."""
+        self._ttl = inf if ttl is None else ttl
+        self._maxsize = maxsize
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any | None:
+        """Return value for the key or None if missing or expired."""
+        if (item := self._data.get(key)) is None:
+            return None
+
+        expires, value = item
+        if expires <= monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+
+        return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        """Store value for the key, evicting the least recently used entry.
+
+        The entry expires after ttl seconds, by default after the ttl of the cache.
+        """
+        self._data[key] = (monotonic() + (self._ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        if len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def items(self) -> list[tuple[str, Any, float]]:
+        """Return keys, values and remaining ttl of the entries not expired."""
+        now = monotonic()
+
+        return [
+            (key, value, expires - now)
+            for key, (expires, value) in self._data.items()
+            if expires > now
+        ]
+
+    def pop(self, key: str) -> None:
+        """Remove the key from the cache."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        """Return the number of entries."""
+        return len(self._data)
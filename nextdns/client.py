@@ -0,0 +1,1485 @@
+"""NextDNS API client."""
+
+import asyncio
+import codecs
+import csv
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+from array import array
+from collections.abc import AsyncGenerator, Callable, Iterable, Iterator
+from contextlib import suppress
+from contextvars import ContextVar
+from dataclasses import asdict, fields
+from datetime import UTC, datetime, timedelta
+from email.utils import parsedate_to_datetime
+from functools import partial
+from http import HTTPStatus
+from operator import itemgetter
+from pathlib import Path
+from time import monotonic, time
+from typing import Any, BinaryIO, Self, cast
+
+from aiohttp import (
+    ClientConnectorError,
+    ClientError,
+    ClientResponse,
+    ClientSession,
+    ClientTimeout,
+    TCPConnector,
+    hdrs,
+)
+from tenacity import (
+    RetryCallState,
+    RetryError,
+    after_log,
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_incrementing,
+)
+from yarl import URL
+
+from .cache import TtlCache
+from .const import (
+    ALLOWED_LOGS_LOCATION,
+    ALLOWED_LOGS_RETENTION,
+    ALLOWED_LOGS_STATUS,
+    API_ENDPOINT,
+    ATTR_ANALYTICS,
+    ATTR_CLEAR_LOGS,
+    ATTR_GET_LOGS,
+    ATTR_LOGS_LOCATION,
+    ATTR_LOGS_RETENTION,
+    ATTR_PARENTAL_CONTROL_CATEGORIES,
+    ATTR_PARENTAL_CONTROL_SERVICES,
+    ATTR_PROFILE,
+    ATTR_PROFILES,
+    ATTR_QUERY_LOGS,
+    ATTR_STREAM_LOGS,
+    ATTR_TEST,
+    CONNECTIONS_PER_HOST,
+    DNS_CACHE_TTL,
+    DOWNLOAD_TIMEOUT,
+    ENDPOINTS,
+    HTTP_STATUS_TIMEOUT,
+    KEEPALIVE_TIMEOUT,
+    LOGS_CHUNK_SIZE,
+    LOGS_LIMIT,
+    MAP_ANALYTICS,
+    MAP_DNSSEC,
+    MAP_ENCRYPTED,
+    MAP_IP_VERSIONS,
+    MAP_PROFILE,
+    MAP_PROTOCOLS,
+    MAP_SETTING,
+    MAP_STATUS,
+    MAX_LOGS_LIMIT,
+    MIN_LOGS_LIMIT,
+    PARENTAL_CONTROL_CATEGORIES,
+    PARENTAL_CONTROL_SERVICES,
+    PROFILE_CACHE_SIZE,
+    RATE_LIMIT_ATTEMPTS,
+    RETRY_AFTER,
+    ROLLOUT_CONCURRENCY,
+    SNAPSHOT_VERSION,
+    STOP_AFTER_ATTEMPT,
+    STREAM_BUFFER_SIZE,
+    STREAM_RECONNECT_DELAY,
+    STREAM_TIMEOUT,
+    TIMEOUT,
+    VALIDATOR_CACHE_SIZE,
+    WAIT_INCREMENT,
+    WAIT_START,
+)
+from .exceptions import (
+    ApiError,
+    InvalidApiKeyError,
+    NextDnsError,
+    ProfileIdNotFoundError,
+    ProfileNameNotFoundError,
+    SettingNotSupportedError,
+)
+from .hooks import RequestHooks, match_url_template
+from .limiter import ConcurrencyLimiter, RateLimiter
+from .metrics import ClientMetrics
+from .model import (
+    AllAnalytics,
+    AnalyticsDnssec,
+    AnalyticsEncryption,
+    AnalyticsIpVersions,
+    AnalyticsProtocols,
+    AnalyticsSeries,
+    AnalyticsStatus,
+    ConnectionStatus,
+    LogEntry,
+    Profile,
+    ProfileInfo,
+    RequestEvent,
+    RolloutResult,
+    Settings,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Holds the last failed request of an attempt and its hooks, the holder is set
+# before the attempt so tasks coalescing the requests share it
+_failed_request: ContextVar[list[tuple[tuple[RequestHooks, ...], RequestEvent]]] = (
+    ContextVar("failed_request")
+)
+
+
+def _before_attempt(_: RetryCallState) -> None:
+    """Set a holder for the failed request of the attempt."""
+    _failed_request.set([])
+
+
+def _before_retry(_: RetryCallState) -> None:
+    """Call the retry hooks with the failed request."""
+    for hooks, event in _failed_request.get([]):
+        for hook in hooks:
+            hook.on_retry(event)
+
+
+_retry = retry(
+    retry=retry_if_exception_type((TimeoutError, ClientConnectorError)),
+    stop=stop_after_attempt(STOP_AFTER_ATTEMPT),
+    wait=wait_incrementing(start=WAIT_START, increment=WAIT_INCREMENT),
+    before=_before_attempt,
+    before_sleep=_before_retry,
+    after=after_log(_LOGGER, logging.DEBUG),
+)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_LOG_FIELDS = tuple(field.name for field in fields(LogEntry))
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class NextDns:
+    """Main class of NextDNS API wrapper."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        session: ClientSession | None,
+        api_key: str,
+        *,
+        profile_cache_ttl: float | None = None,
+        profile_cache_size: int = PROFILE_CACHE_SIZE,
+        rate_limiter: RateLimiter | None = None,
+        concurrency_limiter: ConcurrencyLimiter | None = None,
+        conditional_requests: bool = False,
+        json_loads: Callable[[str], Any] = json.loads,
+        json_dumps: Callable[[Any], str | bytes] | None = None,
+        metrics: ClientMetrics | None = None,
+        snapshot_path: str | Path | None = None,
+    ) -> None:
+        """Initialize NextDNS API wrapper.
+
+        Without a session, the client creates one with a connector tuned for the
+        API on its first request and closes it with close() or at the end of the
+        async with block.
+        Profiles are cached for profile_cache_ttl seconds when it is set.
+        With a rate limiter, requests are paced by it and a request rejected with
+        HTTP 429 is sent again after the time given in the Retry-After header.
+        With a concurrency limiter, the number of requests in flight, including
+        those of methods that fan out like get_all_analytics(), adapts to the load
+        of the API.
+        With conditional requests, GET requests send the ETag and Last-Modified
+        validators of the previous response and reuse its data when the API
+        answers HTTP 304.
+        Responses are decoded with json_loads and request bodies are encoded with
+        json_dumps, by default with the JSON serializer of the session, so a faster
+        library like orjson can be used.
+        With metrics, requests and cache lookups are counted in the registry.
+        With a snapshot path, the profiles and cached profile documents are saved
+        to the file, and initialize() loads them from it and refreshes the
+        profiles in the background instead of waiting for the API.
+        """
+        # Created on first use, the connector needs a running event loop
+        self._client_session = session
+        self._owns_session = session is None
+        self._headers = {"X-Api-Key": api_key, "Content-Type": "application/json"}
+        self._profiles: list[ProfileInfo]
+        self._profiles_loaded = False
+        self._profile_names: dict[str, str] = {}
+        self._profile_ids: dict[str, str] = {}
+        self._profile_fingerprints: dict[str, str] = {}
+        self._snapshot_path = None if snapshot_path is None else Path(snapshot_path)
+        self._revalidation: asyncio.Task[None] | None = None
+        self._profile_cache = (
+            TtlCache(profile_cache_ttl, profile_cache_size)
+            if profile_cache_ttl is not None
+            else None
+        )
+        self._inflight: dict[str, asyncio.Future[Any]] = {}
+        # Incremented by each change of the profile
+        self._profile_generations: dict[str, int] = {}
+        self._rate_limiter = rate_limiter
+        self._concurrency_limiter = concurrency_limiter
+        self._validator_cache = (
+            TtlCache(None, VALIDATOR_CACHE_SIZE) if conditional_requests else None
+        )
+        self._json_loads = json_loads
+        self._json_dumps = json_dumps
+        self._hooks: list[RequestHooks] = []
+        self._metrics = metrics
+        if metrics is not None:
+            self._hooks.append(metrics)
+
+    @property
+    def _session(self) -> ClientSession:
+        """Return the session, created on first use when the client owns it."""
+        if self._client_session is None:
+            self._client_session = _create_session()
+
+        return self._client_session
+
+    @classmethod
+    async def create(
+        cls, session: ClientSession | None, api_key: str, **kwargs: Any
+    ) -> Self:
+        """Create a new instance."""
+        instance = cls(session, api_key, **kwargs)
+        try:
+            await instance.initialize()
+        except BaseException:
+            await instance.close()
+            raise
+
+        return instance
+
+    async def close(self) -> None:
+        """Save the snapshot and close the session if it was created by the client."""
+        if self._revalidation is not None:
+            self._revalidation.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._revalidation
+        # Not to overwrite the snapshot when the profiles have never been loaded
+        if self._snapshot_path is not None and self._profiles_loaded:
+            await self.save_snapshot()
+        if self._owns_session and self._client_session is not None:
+            await self._client_session.close()
+
+    async def __aenter__(self) -> Self:
+        """Return the client."""
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Close the session if it was created by the client."""
+        await self.close()
+
+    async def warm_up(self, connections: int = 1) -> None:
+        """Open connections to the API before the first calls.
+
+        The connections are kept alive in the pool of the session, so the next
+        requests don't wait for the TCP and TLS handshakes.
+        """
+
+        async def connect() -> None:
+            try:
+                async with self._session.head(API_ENDPOINT, timeout=TIMEOUT) as resp:
+                    await resp.read()
+            except (ClientError, TimeoutError) as error:
+                _LOGGER.debug("Warm-up connection failed: %s", error)
+
+        await asyncio.gather(*(connect() for _ in range(connections)))
+
+    async def initialize(self) -> None:
+        """Initialize."""
+        _LOGGER.debug("Initializing...")
+        if self._snapshot_path is not None and await self._load_snapshot(
+            self._snapshot_path
+        ):
+            self._revalidation = asyncio.create_task(self._revalidate())
+            return
+
+        await self.refresh_profiles()
+
+    async def refresh_profiles(self) -> None:
+        """Refresh the list of profiles."""
+        self._set_profiles(self._parse_profiles(await self.get_profiles()))
+        if self._snapshot_path is not None:
+            await self.save_snapshot()
+
+    async def save_snapshot(self) -> None:
+        """Save the profiles and cached profile documents to the snapshot file."""
+        if self._snapshot_path is None:
+            raise ValueError("The snapshot path is not set")
+
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "profiles": [asdict(profile) for profile in self._profiles],
+            # Wall clock expiry, the monotonic clock restarts with the process
+            "profile_data": (
+                {}
+                if self._profile_cache is None
+                else {
+                    profile_id: {"expires": time() + ttl, "profile": asdict(profile)}
+                    for profile_id, profile, ttl in self._profile_cache.items()
+                }
+            ),
+        }
+        await asyncio.to_thread(_write_snapshot, self._snapshot_path, data)
+
+    async def _load_snapshot(self, path: Path) -> bool:
+        """Load the profiles from the snapshot file, return True if loaded."""
+        if (data := await asyncio.to_thread(_read_snapshot, path)) is None:
+            return False
+
+        try:
+            profiles = self._parse_profiles(data["profiles"])
+            now = time()
+            profile_data = [
+                (profile_id, Profile(**item["profile"]), item["expires"] - now)
+                for profile_id, item in data["profile_data"].items()
+            ]
+        except (AttributeError, KeyError, TypeError) as error:
+            _LOGGER.debug("Invalid snapshot %s: %s", path, error)
+            return False
+
+        self._set_profiles(profiles)
+        if self._profile_cache is not None:
+            for profile_id, profile, ttl in profile_data:
+                # Expired documents are fetched again
+                if ttl > 0:
+                    self._profile_cache.set(profile_id, profile, ttl)
+        _LOGGER.debug("Loaded %s profiles from snapshot %s", len(profiles), path)
+
+        return True
+
+    async def _revalidate(self) -> None:
+        """Refresh the profiles loaded from the snapshot."""
+        try:
+            await self.refresh_profiles()
+        except (NextDnsError, ClientError, TimeoutError, RetryError) as error:
+            _LOGGER.warning("Refreshing profiles from the snapshot failed: %s", error)
+
+    def _set_profiles(self, profiles: list[ProfileInfo]) -> None:
+        """Set the profiles and their lookups."""
+        self._profiles = profiles
+        self._profiles_loaded = True
+        self._profile_names = {profile.id: profile.name for profile in profiles}
+        # The first profile with the name wins, like in the list
+        self._profile_ids = {profile.name: profile.id for profile in reversed(profiles)}
+        self._profile_fingerprints = {
+            profile.fingerprint: profile.id for profile in profiles
+        }
+
+    @_retry
+    async def get_profiles(self) -> list[dict[str, str]]:
+        """Get all profiles."""
+        url = ENDPOINTS[ATTR_PROFILES]
+
+        return cast(list[dict[str, str]], await self._http_request("get", url))
+
+    @_retry
+    async def get_profile(self, profile_id: str) -> Profile:
+        """Get profile."""
+        if self._profile_cache is not None:
+            profile = self._profile_cache.get(profile_id)
+            if self._metrics is not None:
+                self._metrics.record_cache("profile", hit=profile is not None)
+            if profile is not None:
+                return cast(Profile, profile)
+
+        generation = self._profile_generations.get(profile_id, 0)
+        url = ENDPOINTS[ATTR_PROFILE].format(profile_id=profile_id)
+        resp = await self._http_request("get", url)
+
+        profile = Profile(
+            **{MAP_PROFILE.get(key, key): value for key, value in resp.items()}
+        )
+        # A profile changed during the request may be stale, it's not cached
+        if (
+            self._profile_cache is not None
+            and self._profile_generations.get(profile_id, 0) == generation
+        ):
+            self._profile_cache.set(profile_id, profile)
+
+        return profile
+
+    async def get_settings(self, profile_id: str) -> Settings:
+        """Get profile settings."""
+        profile_data = await self.get_profile(profile_id)
+
+        return _decode_settings(profile_data)
+
+    @_retry
+    async def get_analytics_status(
+        self,
+        profile_id: str,
+        *,
+        date_from: datetime | str | None = None,
+        date_to: datetime | str | None = None,
+    ) -> AnalyticsStatus:
+        """Get profile analytics status."""
+        url = _analytics_url(profile_id, "status", date_from, date_to)
+        resp = await self._http_request("get", url)
+
+        return AnalyticsStatus(
+            **{MAP_STATUS[item["status"]]: item["queries"] for item in resp}
+        )
+
+    @_retry
+    async def get_analytics_dnssec(
+        self,
+        profile_id: str,
+        *,
+        date_from: datetime | str | None = None,
+        date_to: datetime | str | None = None,
+    ) -> AnalyticsDnssec:
+        """Get profile analytics dnssec."""
+        url = _analytics_url(profile_id, "dnssec", date_from, date_to)
+        resp = await self._http_request("get", url)
+
+        return AnalyticsDnssec(
+            **{MAP_DNSSEC[item["validated"]]: item["queries"] for item in resp}
+        )
+
+    @_retry
+    async def get_analytics_encryption(
+        self,
+        profile_id: str,
+        *,
+        date_from: datetime | str | None = None,
+        date_to: datetime | str | None = None,
+    ) -> AnalyticsEncryption:
+        """Get profile analytics encryption."""
+        url = _analytics_url(profile_id, "encryption", date_from, date_to)
+        resp = await self._http_request("get", url)
+
+        return AnalyticsEncryption(
+            **{MAP_ENCRYPTED[item["encrypted"]]: item["queries"] for item in resp}
+        )
+
+    @_retry
+    async def get_analytics_ip_versions(
+        self,
+        profile_id: str,
+        *,
+        date_from: datetime | str | None = None,
+        date_to: datetime | str | None = None,
+    ) -> AnalyticsIpVersions:
+        """Get profile analytics IP versions."""
+        url = _analytics_url(profile_id, "ipVersions", date_from, date_to)
+        resp = await self._http_request("get", url)
+
+        return AnalyticsIpVersions(
+            **{MAP_IP_VERSIONS[item["version"]]: item["queries"] for item in resp}
+        )
+
+    @_retry
+    async def get_analytics_protocols(
+        self,
+        profile_id: str,
+        *,
+        date_from: datetime | str | None = None,
+        date_to: datetime | str | None = None,
+    ) -> AnalyticsProtocols:
+        """Get profile analytics protocols."""
+        url = _analytics_url(profile_id, "protocols", date_from, date_to)
+        resp = await self._http_request("get", url)
+
+        return AnalyticsProtocols(
+            **{MAP_PROTOCOLS[item["protocol"]]: item["queries"] for item in resp}
+        )
+
+    @_retry
+    async def get_analytics_series(
+        self,
+        profile_id: str,
+        analytics_type: str,
+        *,
+        date_from: datetime | str | None = None,
+        date_to: datetime | str | None = None,
+        interval: int | str | None = None,
+    ) -> AnalyticsSeries:
+        """Get profile analytics time series.
+
+        Each mapped key of the analytics type, for example allowed_queries for
+        status, gets a column with the number of queries at every point in time.
+        """
+        if analytics_type not in MAP_ANALYTICS:
+            raise ValueError(
+                "Invalid analytics type value. "
+                f"Allowed values are: {tuple(MAP_ANALYTICS)}"
+            )
+
+        key, mapping = MAP_ANALYTICS[analytics_type]
+        url = ENDPOINTS[ATTR_ANALYTICS].format(
+            profile_id=profile_id, type=f"{analytics_type};series"
+        )
+        params = _query_params({"from": date_from, "to": date_to, "interval": interval})
+        resp = await self._request("get", url, params=params)
+        result = await resp.json(loads=self._json_loads)
+
+        series = result["meta"]["series"]
+        times = array(
+            "q", (_parse_timestamp(time) // 1_000_000 for time in series["times"])
+        )
+        queries = {
+            name: array("q", bytes(times.itemsize * len(times)))
+            for name in mapping.values()
+        }
+        for item in result["data"]:
+            if (name := mapping.get(item[key])) is not None:
+                queries[name] = array("q", item["queries"])
+
+        return AnalyticsSeries(series["interval"], times, queries)
+
+    @_retry
+    async def connection_status(self, profile_id: str) -> ConnectionStatus:
+        """Return True if the device is using NextDNS."""
+        url = ENDPOINTS[ATTR_TEST].format(profile_id=profile_id)
+        resp = await self._http_request("get", url)
+
+        status = resp["status"] == "ok"
+        used_profile_id = None
+        if status:
+            used_profile_id = self._profile_fingerprints.get(resp.get("profile"))
+
+        return ConnectionStatus(status, used_profile_id)
+
+    async def clear_logs(self, profile_id: str) -> bool:
+        """Clear NextDNS logs."""
+        url = ENDPOINTS[ATTR_CLEAR_LOGS].format(profile_id=profile_id)
+        result = await self._http_request("delete", url)
+
+        return result.get("success", False)
+
+    @_retry
+    async def get_logs(self, profile_id: str) -> str:
+        """Get NextDNS logs."""
+        url = ENDPOINTS[ATTR_GET_LOGS].format(profile_id=profile_id)
+        result = await self._http_request("get", url)
+
+        return cast(str, result)
+
+    async def iter_logs_raw(
+        self, profile_id: str, chunk_size: int = LOGS_CHUNK_SIZE
+    ) -> AsyncGenerator[bytes]:
+        """Iterate over NextDNS logs CSV in chunks of bytes."""
+        url = ENDPOINTS[ATTR_GET_LOGS].format(profile_id=profile_id)
+        resp = await self._request("get", url, client_timeout=DOWNLOAD_TIMEOUT)
+
+        try:
+            async for chunk in resp.content.iter_chunked(chunk_size):
+                yield chunk
+        finally:
+            resp.release()
+
+    async def download_logs_to(self, profile_id: str, path: str | Path) -> int:
+        """Download NextDNS logs to the file and return the number of bytes.
+
+        A failed download is not retried, it would start the file from scratch.
+        """
+        size = 0
+        file = cast(BinaryIO, await asyncio.to_thread(Path(path).open, "wb"))
+        try:
+            async for chunk in self.iter_logs_raw(profile_id):
+                await asyncio.to_thread(file.write, chunk)
+                size += len(chunk)
+        finally:
+            await asyncio.to_thread(file.close)
+
+        return size
+
+    async def iter_log_entries(self, profile_id: str) -> AsyncGenerator[LogEntry]:
+        """Iterate over NextDNS logs parsed into log entries."""
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        columns: list[int] = []
+        pending = ""
+
+        async for chunk in self.iter_logs_raw(profile_id):
+            pending += decoder.decode(chunk)
+            end = pending.rfind("\n") + 1
+            # A quoted value may contain a newline, so cut only at the end of a record
+            if not end or pending.count('"', 0, end) % 2:
+                continue
+            for entry in _parse_log_rows(pending[:end], columns):
+                yield entry
+            pending = pending[end:]
+
+        pending += decoder.decode(b"", final=True)
+        for entry in _parse_log_rows(pending, columns):
+            yield entry
+
+    async def iter_logs(  # noqa: PLR0913
+        self,
+        profile_id: str,
+        *,
+        date_from: datetime | str | None = None,
+        date_to: datetime | str | None = None,
+        status: str | None = None,
+        device: str | None = None,
+        search: str | None = None,
+        limit: int = LOGS_LIMIT,
+    ) -> AsyncGenerator[LogEntry]:
+        """Iterate over NextDNS logs, following the cursor page by page."""
+        if status is not None and status not in ALLOWED_LOGS_STATUS:
+            raise ValueError(
+                f"Invalid logs status value. Allowed values are: {ALLOWED_LOGS_STATUS}"
+            )
+        if not MIN_LOGS_LIMIT <= limit <= MAX_LOGS_LIMIT:
+            raise ValueError(
+                "Invalid logs limit value. "
+                f"Allowed values are from {MIN_LOGS_LIMIT} to {MAX_LOGS_LIMIT}"
+            )
+
+        url = ENDPOINTS[ATTR_QUERY_LOGS].format(profile_id=profile_id)
+        params = _query_params(
+            {
+                "from": date_from,
+                "to": date_to,
+                "status": status,
+                "device": device,
+                "search": search,
+                "limit": limit,
+            }
+        )
+
+        # The next page is fetched while the caller handles the current one
+        page = asyncio.create_task(self._get_logs_page(url, params))
+        try:
+            while True:
+                records, cursor = await page
+                if cursor:
+                    page = asyncio.create_task(
+                        self._get_logs_page(url, {**params, "cursor": cursor})
+                    )
+                for record in records:
+                    yield _parse_log_record(record)
+                if not cursor:
+                    return
+        finally:
+            page.cancel()
+            with suppress(asyncio.CancelledError, Exception):
+                await page
+
+    @_retry
+    async def _get_logs_page(
+        self, url: str, params: dict[str, Any]
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """Get a page of NextDNS logs and the cursor of the next page."""
+        resp = await self._request("get", url, params=params)
+        result = await resp.json(loads=self._json_loads)
+
+        return result["data"], result["meta"]["pagination"]["cursor"]
+
+    async def stream_logs(
+        self,
+        profile_id: str,
+        *,
+        device: str | None = None,
+        search: str | None = None,
+        last_event_id: str | None = None,
+        buffer_size: int = STREAM_BUFFER_SIZE,
+    ) -> AsyncGenerator[LogEntry]:
+        """Iterate over NextDNS logs in real time.
+
+        The stream is resumed from the last received event after a disconnection.
+        When the buffer is full, reading from the connection pauses until the
+        caller catches up.
+        """
+        url = ENDPOINTS[ATTR_STREAM_LOGS].format(profile_id=profile_id)
+        params = _query_params({"device": device, "search": search})
+        queue: asyncio.Queue[LogEntry | Exception] = asyncio.Queue(buffer_size)
+        reader = asyncio.create_task(
+            self._read_logs_stream(url, params, last_event_id, queue)
+        )
+
+        try:
+            while True:
+                item = await queue.get()
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            reader.cancel()
+            with suppress(asyncio.CancelledError):
+                await reader
+
+    async def _read_logs_stream(
+        self,
+        url: str,
+        params: dict[str, Any],
+        last_event_id: str | None,
+        queue: asyncio.Queue[LogEntry | Exception],
+    ) -> None:
+        """Read server-sent events of the logs stream into the queue."""
+        while True:
+            if last_event_id is not None:
+                params = {**params, "id": last_event_id}
+            try:
+                resp = await self._request(
+                    "get", url, params=params, client_timeout=STREAM_TIMEOUT
+                )
+                try:
+                    data: list[str] = []
+                    async for raw_line in resp.content:
+                        line = raw_line.decode().rstrip("\r\n")
+                        if not line:
+                            if data:
+                                record = self._json_loads("\n".join(data))
+                                await queue.put(_parse_log_record(record))
+                                data.clear()
+                            continue
+                        field, _, value = line.partition(":")
+                        value = value.removeprefix(" ")
+                        if field == "data":
+                            data.append(value)
+                        elif field == "id":
+                            last_event_id = value
+                finally:
+                    resp.release()
+            except (ClientError, TimeoutError) as error:
+                _LOGGER.debug("Logs stream disconnected: %s", error)
+            # Any other error ends the stream, the caller must not wait forever
+            except Exception as error:  # noqa: BLE001
+                await queue.put(error)
+                return
+
+            await asyncio.sleep(STREAM_RECONNECT_DELAY)
+
+    async def get_all_analytics(
+        self,
+        profile_id: str,
+        *,
+        date_from: datetime | str | None = None,
+        date_to: datetime | str | None = None,
+    ) -> AllAnalytics:
+        """Get profile analytics."""
+        resp = await asyncio.gather(
+            self.get_analytics_dnssec(profile_id, date_from=date_from, date_to=date_to),
+            self.get_analytics_encryption(
+                profile_id, date_from=date_from, date_to=date_to
+            ),
+            self.get_analytics_ip_versions(
+                profile_id, date_from=date_from, date_to=date_to
+            ),
+            self.get_analytics_protocols(
+                profile_id, date_from=date_from, date_to=date_to
+            ),
+            self.get_analytics_status(profile_id, date_from=date_from, date_to=date_to),
+        )
+
+        return AllAnalytics(*resp)
+
+    async def set_logs_location(self, profile_id: str, location: str) -> bool:
+        """Set logs location."""
+        self._validate_logs_location(location)
+
+        url = MAP_SETTING[ATTR_LOGS_LOCATION].url.format(profile_id=profile_id)
+        name = MAP_SETTING[ATTR_LOGS_LOCATION].name
+        try:
+            result = await self._http_request("patch", url, data={name: location})
+        finally:
+            self._invalidate_profile(profile_id)
+
+        return result.get("success", False)
+
+    async def set_logs_retention(self, profile_id: str, hours: int) -> bool:
+        """Set logs retention."""
+        self._validate_logs_retention(hours)
+
+        url = MAP_SETTING[ATTR_LOGS_RETENTION].url.format(profile_id=profile_id)
+        name = MAP_SETTING[ATTR_LOGS_RETENTION].name
+        try:
+            result = await self._http_request(
+                "patch", url, data={name: hours * 60 * 60}
+            )
+        finally:
+            self._invalidate_profile(profile_id)
+
+        return result.get("success", False)
+
+    async def set_setting(self, profile_id: str, setting: str, state: bool) -> bool:
+        """Toggle settings."""
+        if setting not in MAP_SETTING:
+            raise SettingNotSupportedError
+
+        # A failed request may still have changed the profile
+        try:
+            if (
+                setting in PARENTAL_CONTROL_CATEGORIES
+                or setting in PARENTAL_CONTROL_SERVICES
+            ):
+                resp = await self._set_parental_control(profile_id, setting, state)
+            else:
+                desc = MAP_SETTING[setting]
+                url = desc.url.format(profile_id=profile_id)
+                resp = await self._http_request(
+                    "patch", url, data={str(desc.name): state}
+                )
+        finally:
+            self._invalidate_profile(profile_id)
+
+        return resp.get("success", False)
+
+    async def set_settings(self, profile_id: str, settings: dict[str, Any]) -> bool:
+        """Set many settings, sending one request per API endpoint.
+
+        Values are states of toggles, the logs location, and the logs retention
+        in hours.
+        """
+        payloads, parental_control = self._group_settings(settings)
+
+        return await self._apply_settings(profile_id, payloads, parental_control)
+
+    async def rollout_settings(
+        self,
+        settings: dict[str, Any],
+        profile_ids: Iterable[str] | None = None,
+        *,
+        max_concurrency: int = ROLLOUT_CONCURRENCY,
+        progress_callback: Callable[[RolloutResult, int, int], None] | None = None,
+    ) -> list[RolloutResult]:
+        """Set many settings for many profiles, all profiles by default.
+
+        The progress callback gets the result for a profile, the number of
+        profiles done and the number of all profiles.
+        """
+        payloads, parental_control = self._group_settings(settings)
+        if profile_ids is None:
+            profile_ids = [profile.id for profile in self.profiles]
+        profile_ids = list(profile_ids)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        done = 0
+
+        async def rollout(profile_id: str) -> RolloutResult:
+            nonlocal done
+            async with semaphore:
+                try:
+                    success = await self._apply_settings(
+                        profile_id, payloads, parental_control
+                    )
+                except (NextDnsError, ClientError, TimeoutError) as error:
+                    _LOGGER.debug("Rollout to %s failed: %s", profile_id, error)
+                    result = RolloutResult(profile_id, success=False, error=error)
+                else:
+                    result = RolloutResult(profile_id, success)
+
+            done += 1
+            if progress_callback is not None:
+                progress_callback(result, done, len(profile_ids))
+
+            return result
+
+        return await asyncio.gather(*(rollout(item) for item in profile_ids))
+
+    def _group_settings(
+        self, settings: dict[str, Any]
+    ) -> tuple[dict[str, dict[str, Any]], list[tuple[str, bool]]]:
+        """Group settings by endpoint, parental control settings go separately."""
+        if not settings.keys() <= MAP_SETTING.keys():
+            raise SettingNotSupportedError
+
+        payloads: dict[str, dict[str, Any]] = {}
+        parental_control: list[tuple[str, bool]] = []
+        for setting, value in settings.items():
+            if (
+                setting in PARENTAL_CONTROL_CATEGORIES
+                or setting in PARENTAL_CONTROL_SERVICES
+            ):
+                parental_control.append((setting, value))
+                continue
+
+            if setting == ATTR_LOGS_LOCATION:
+                self._validate_logs_location(value)
+            elif setting == ATTR_LOGS_RETENTION:
+                self._validate_logs_retention(value)
+
+            desc = MAP_SETTING[setting]
+            payloads.setdefault(desc.url, {})[desc.name] = (
+                value * 60 * 60 if setting == ATTR_LOGS_RETENTION else value
+            )
+
+        return payloads, parental_control
+
+    async def _apply_settings(
+        self,
+        profile_id: str,
+        payloads: dict[str, dict[str, Any]],
+        parental_control: list[tuple[str, bool]],
+    ) -> bool:
+        """Send grouped settings of the profile concurrently."""
+        results = await asyncio.gather(
+            *(
+                self._http_request("patch", url.format(profile_id=profile_id), data)
+                for url, data in payloads.items()
+            ),
+            *(
+                self._set_parental_control(profile_id, setting, state)
+                for setting, state in parental_control
+            ),
+            return_exceptions=True,
+        )
+        # Invalidate after every request finished, some may have succeeded
+        self._invalidate_profile(profile_id)
+        success = True
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+            success = success and result.get("success", False)
+
+        return success
+
+    async def _set_parental_control(
+        self, profile_id: str, setting: str, state: bool
+    ) -> dict[str, Any]:
+        """Toggle parental control service or category."""
+        desc = MAP_SETTING[setting]
+        is_category = setting in PARENTAL_CONTROL_CATEGORIES
+        fmt = {"category": desc.name} if is_category else {"service": desc.name}
+        url = desc.url.format(profile_id=profile_id, **fmt)
+        try:
+            return await self._http_request("patch", url, data={"active": state})
+        except ApiError as exc:
+            if "404, notFound" in exc.status and state is True:
+                ep = (
+                    ATTR_PARENTAL_CONTROL_CATEGORIES
+                    if is_category
+                    else ATTR_PARENTAL_CONTROL_SERVICES
+                )
+                url = ENDPOINTS[ep].format(profile_id=profile_id)
+                return await self._http_request("post", url, data={"id": desc.name})
+
+        return {}
+
+    @staticmethod
+    def _validate_logs_location(location: str) -> None:
+        """Validate logs location."""
+        if location not in ALLOWED_LOGS_LOCATION:
+            raise ValueError(
+                "Invalid logs location value. "
+                f"Allowed values are: {ALLOWED_LOGS_LOCATION}"
+            )
+
+    @staticmethod
+    def _validate_logs_retention(hours: int) -> None:
+        """Validate logs retention."""
+        if hours not in ALLOWED_LOGS_RETENTION:
+            raise ValueError(
+                "Invalid logs retention value. "
+                f"Allowed values are: {ALLOWED_LOGS_RETENTION}"
+            )
+
+    def _invalidate_profile(self, profile_id: str) -> None:
+        """Remove the profile from the cache, also the one being fetched."""
+        if self._profile_cache is not None:
+            self._profile_cache.pop(profile_id)
+            self._profile_generations[profile_id] = (
+                self._profile_generations.get(profile_id, 0) + 1
+            )
+
+    async def _http_request(
+        self, method: str, url: str, data: dict[str, Any] | None = None
+    ) -> Any:
+        """Make an HTTP request, concurrent GET requests for a URL share one."""
+        if method != "get":
+            try:
+                return await self._send_http_request(method, url, data)
+            finally:
+                # Later GET requests don't join ones started before the change
+                self._inflight.clear()
+
+        if (task := self._inflight.get(url)) is None:
+            task = asyncio.ensure_future(self._send_http_request(method, url))
+            self._inflight[url] = task
+            task.add_done_callback(partial(self._remove_inflight, url))
+
+        # Shielded, so a cancelled caller doesn't cancel the request for the others
+        return await asyncio.shield(task)
+
+    def _remove_inflight(self, url: str, task: asyncio.Future[Any]) -> None:
+        """Remove the finished request, unless a newer one replaced it."""
+        if self._inflight.get(url) is task:
+            del self._inflight[url]
+
+    async def _send_http_request(
+        self, method: str, url: str, data: dict[str, Any] | None = None
+    ) -> Any:
+        """Send an HTTP request and return the response data."""
+        validators = None
+        headers: dict[str, str] | None = None
+        if (
+            method == "get"
+            and self._validator_cache is not None
+            and (validators := self._validator_cache.get(url))
+        ):
+            etag, last_modified, cached_result = validators
+            headers = {}
+            if etag is not None:
+                headers[hdrs.IF_NONE_MATCH] = etag
+            if last_modified is not None:
+                headers[hdrs.IF_MODIFIED_SINCE] = last_modified
+
+        resp = await self._request(method, url, data, headers=headers)
+
+        if (
+            self._metrics is not None
+            and method == "get"
+            and self._validator_cache is not None
+        ):
+            self._metrics.record_cache(
+                "validator",
+                hit=bool(validators) and resp.status == HTTPStatus.NOT_MODIFIED,
+            )
+        if resp.status == HTTPStatus.NO_CONTENT:
+            return {"success": True}
+        if resp.status == HTTPStatus.NOT_MODIFIED and validators:
+            return cached_result
+
+        if resp.content_type != "application/json":
+            # Not cached, like the CSV logs download it may be large
+            return await resp.text()
+
+        result = await resp.json(loads=self._json_loads)
+        if isinstance(result, dict) and "data" in result:
+            result = result["data"]
+
+        if method == "get" and self._validator_cache is not None:
+            etag = resp.headers.get(hdrs.ETAG)
+            last_modified = resp.headers.get(hdrs.LAST_MODIFIED)
+            if etag is not None or last_modified is not None:
+                self._validator_cache.set(url, (etag, last_modified, result))
+
+        return result
+
+    def add_request_hooks(self, hooks: RequestHooks) -> Callable[[], None]:
+        """Add hooks for request events and return a function removing them."""
+        self._hooks.append(hooks)
+
+        return lambda: self._hooks.remove(hooks)
+
+    async def _request(  # noqa: PLR0913
+        self,
+        method: str,
+        url: str,
+        data: dict[str, Any] | None = None,
+        *,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        client_timeout: ClientTimeout = TIMEOUT,
+    ) -> ClientResponse:
+        """Send an HTTP request and return the response with a valid status."""
+        _LOGGER.debug(
+            "Requesting %s, method: %s, data: %s, params: %s", url, method, data, params
+        )
+        kwargs: dict[str, Any] = {
+            "headers": self._headers if headers is None else self._headers | headers,
+            "timeout": client_timeout,
+        }
+        bytes_sent = 0
+        if data is not None:
+            # Encoded once, the length is reused by the hooks of every attempt
+            kwargs["data"] = body = self._encode_body(data)
+            bytes_sent = len(body)
+        if params is not None:
+            kwargs["params"] = params
+
+        for attempt in range(1, RATE_LIMIT_ATTEMPTS + 1):
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire()
+
+            # Hooks added or removed during the attempt are not called for it
+            hooks = tuple(self._hooks)
+            event: RequestEvent | None = None
+            if not hooks:
+                resp = await self._send(method, url, kwargs)
+            elif len(hooks) == 1 and hooks[0] is self._metrics:
+                resp = await self._send_with_metrics(
+                    method, url, kwargs, attempt, bytes_sent
+                )
+            else:
+                event = self._request_event(method, url, attempt, bytes_sent)
+                resp = await self._send_with_hooks(method, url, kwargs, hooks, event)
+
+            _LOGGER.debug("Response status %s for %s", resp.status, url)
+
+            if (
+                resp.status != HTTPStatus.TOO_MANY_REQUESTS
+                or self._rate_limiter is None
+                or attempt == RATE_LIMIT_ATTEMPTS
+            ):
+                break
+
+            delay = _parse_retry_after(resp.headers.get(hdrs.RETRY_AFTER))
+            _LOGGER.debug("Too many requests, waiting %s seconds", delay)
+            self._rate_limiter.pause(delay)
+            resp.release()
+            if hooks:
+                event = event or self._request_event(method, url, attempt, bytes_sent)
+                for hook in hooks:
+                    hook.on_retry(event)
+
+        try:
+            return await self._check_response(method, resp)
+        except (NextDnsError, TimeoutError) as error:
+            if hooks:
+                event = event or self._request_event(method, url, attempt, bytes_sent)
+                event.error = error
+                self._failed(hooks, event)
+            raise
+
+    def _encode_body(self, data: dict[str, Any]) -> bytes:
+        """Encode the request body, by default with the session serializer."""
+        body = (self._json_dumps or self._session.json_serialize)(data)
+
+        return body.encode() if isinstance(body, str) else body
+
+    async def _check_response(
+        self, method: str, resp: ClientResponse
+    ) -> ClientResponse:
+        """Return the response or raise an error for its status."""
+        if resp.status == HTTPStatus.FORBIDDEN:
+            raise InvalidApiKeyError
+        if resp.status == HTTPStatus.NO_CONTENT and method in (
+            "delete",
+            "patch",
+            "post",
+        ):
+            return resp
+        if resp.status == HTTPStatus.NOT_MODIFIED and method == "get":
+            return resp
+        if resp.status == HTTPStatus.TOO_MANY_REQUESTS:
+            raise ApiError("Too many requests")
+        if resp.status == HTTP_STATUS_TIMEOUT:
+            raise TimeoutError("Timeout occurred: HTTP 524")
+        if resp.status != HTTPStatus.OK:
+            if resp.content_type == "application/json":
+                result = await resp.json(loads=self._json_loads)
+                error = result["errors"][0]
+                raise ApiError(
+                    f"{resp.status}, {error['code']}, "
+                    f"{error.get('detail', 'no detail')}"
+                )
+            raise ApiError(f"Error code: {resp.status}")
+
+        return resp
+
+    @staticmethod
+    def _request_event(
+        method: str, url: str, attempt: int, bytes_sent: int
+    ) -> RequestEvent:
+        """Return the event of the request for the hooks."""
+        url_template, url_params = match_url_template(url)
+
+        return RequestEvent(
+            method, url, url_template, url_params, attempt, monotonic(), bytes_sent
+        )
+
+    async def _send_with_metrics(
+        self,
+        method: str,
+        url: str,
+        kwargs: dict[str, Any],
+        attempt: int,
+        bytes_sent: int,
+    ) -> ClientResponse:
+        """Send an HTTP request and update the metrics without an event."""
+        metrics = cast(ClientMetrics, self._metrics)
+        url_template = match_url_template(url)[0]
+        metrics.record_request(method, url_template, bytes_sent)
+        started = monotonic()
+
+        try:
+            resp = await self._send(method, url, kwargs)
+        except (ClientError, TimeoutError) as error:
+            # Errors are rare, only they need an event for the retry hooks
+            event = self._request_event(method, url, attempt, bytes_sent)
+            event.error = error
+            self._failed((metrics,), event)
+            raise
+
+        metrics.record_response(
+            method,
+            url_template,
+            monotonic() - started,
+            resp.status,
+            resp.content_length,
+        )
+
+        return resp
+
+    async def _send_with_hooks(
+        self,
+        method: str,
+        url: str,
+        kwargs: dict[str, Any],
+        hooks: tuple[RequestHooks, ...],
+        event: RequestEvent,
+    ) -> ClientResponse:
+        """Send an HTTP request and call the hooks for its events."""
+        for hook in hooks:
+            hook.on_request_start(event)
+
+        try:
+            resp = await self._send(method, url, kwargs)
+        except (ClientError, TimeoutError) as error:
+            event.elapsed = monotonic() - event.started
+            event.error = error
+            self._failed(hooks, event)
+            raise
+
+        event.elapsed = monotonic() - event.started
+        event.status = resp.status
+        event.bytes_received = resp.content_length
+        for hook in hooks:
+            hook.on_response(event)
+
+        return resp
+
+    @staticmethod
+    def _failed(hooks: tuple[RequestHooks, ...], event: RequestEvent) -> None:
+        """Call the error hooks and remember the request for the retry hooks."""
+        if (failed := _failed_request.get(None)) is not None:
+            failed[:] = [(hooks, event)]
+        for hook in hooks:
+            hook.on_error(event)
+
+    async def _send(
+        self, method: str, url: str, kwargs: dict[str, Any]
+    ) -> ClientResponse:
+        """Send an HTTP request within the concurrency limit."""
+        if self._concurrency_limiter is None:
+            return await self._session.request(method, url, **kwargs)
+
+        started = await self._concurrency_limiter.acquire()
+        overloaded = False
+        try:
+            resp = await self._session.request(method, url, **kwargs)
+        except TimeoutError:
+            overloaded = True
+            raise
+        else:
+            overloaded = resp.status in (
+                HTTPStatus.TOO_MANY_REQUESTS,
+                HTTP_STATUS_TIMEOUT,
+            )
+        finally:
+            self._concurrency_limiter.release(started, overloaded=overloaded)
+
+        return resp
+
+    def get_profile_name(self, profile_id: str) -> str:
+        """Get profile name."""
+        if (name := self._profile_names.get(profile_id)) is None:
+            raise ProfileIdNotFoundError
+
+        return name
+
+    def get_profile_id(self, profile_name: str) -> str:
+        """Get profile ID."""
+        if (profile_id := self._profile_ids.get(profile_name)) is None:
+            raise ProfileNameNotFoundError
+
+        return profile_id
+
+    @staticmethod
+    def _parse_profiles(profiles: list[dict[str, str]]) -> list[ProfileInfo]:
+        """Parse profiles."""
+        return [ProfileInfo(p["id"], p["fingerprint"], p["name"]) for p in profiles]
+
+    @property
+    def profiles(self) -> list[ProfileInfo]:
+        """Return profiles."""
+        return self._profiles
+
+
+def _items_getter(keys: tuple[str, ...]) -> Callable[[Any], tuple[Any, ...]]:
+    """Return a getter of the values for keys, always as a tuple."""
+    if len(keys) > 1:
+        return itemgetter(*keys)
+
+    (key,) = keys
+    return lambda data: (data[key],)
+
+
+def _build_settings_decoder() -> tuple[
+    tuple[
+        tuple[str, tuple[str, ...], tuple[str, ...], Callable[[Any], tuple[Any, ...]]],
+        ...,
+    ],
+    dict[str, dict[str, str]],
+]:
+    """Build getters for groups of settings and maps of parental control IDs."""
+    groups: dict[tuple[str, ...], dict[str, str]] = {}
+    toggles: dict[str, dict[str, str]] = {}
+    prefix = ENDPOINTS[ATTR_PROFILE] + "/"
+    for attr, description in MAP_SETTING.items():
+        # Interned plain strings, keyword names are matched by identity first
+        name = sys.intern(str(attr))
+        root, *path = description.url.removeprefix(prefix).split("/")
+        if path and path[-1].startswith("{"):
+            # Services and categories are lists of IDs in profile data
+            toggles.setdefault(path[0], {})[str(description.name)] = name
+        else:
+            groups.setdefault((MAP_PROFILE.get(root, root), *path), {})[
+                str(description.name)
+            ] = name
+
+    decoder = tuple(
+        (root, tuple(path), tuple(names.values()), _items_getter(tuple(names)))
+        for (root, *path), names in groups.items()
+    )
+
+    return decoder, toggles
+
+
+_SETTINGS_DECODER, _TOGGLES_DECODER = _build_settings_decoder()
+_TOGGLES_OFF = dict.fromkeys(
+    (attr for attrs in _TOGGLES_DECODER.values() for attr in attrs.values()), False
+)
+
+
+def _decode_settings(profile_data: Profile) -> Settings:
+    """Decode settings from profile data."""
+    values: dict[str, Any] = _TOGGLES_OFF.copy()
+    for root, path, attrs, getter in _SETTINGS_DECODER:
+        data: Any = getattr(profile_data, root)
+        for key in path:
+            data = data[key]
+        values.update(zip(attrs, getter(data), strict=True))
+
+    for kind, attrs in _TOGGLES_DECODER.items():
+        for item in profile_data.parental_control[kind]:
+            if (attr := attrs.get(item["id"])) is not None:
+                values[attr] = item["active"]
+
+    values[ATTR_LOGS_RETENTION] = int(values[ATTR_LOGS_RETENTION] / 3600)
+
+    return Settings(**values)
+
+
+def _read_snapshot(path: Path) -> dict[str, Any] | None:
+    """Return data of the snapshot file or None if missing or invalid."""
+    try:
+        with path.open(encoding="utf-8") as file:
+            data = json.load(file)
+    except (OSError, ValueError) as error:
+        _LOGGER.debug("Snapshot %s not loaded: %s", path, error)
+        return None
+
+    if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+        _LOGGER.debug("Snapshot %s has unsupported version", path)
+        return None
+
+    return data
+
+
+def _write_snapshot(path: Path, data: dict[str, Any]) -> None:
+    """Write the snapshot file atomically, readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=path.parent, prefix=f".{path.name}.", delete=False
+    ) as file:
+        try:
+            json.dump(data, file)
+            file.flush()
+            os.fsync(file.fileno())
+        except BaseException:
+            file.close()
+            Path(file.name).unlink()
+            raise
+
+    Path(file.name).replace(path)
+
+
+def _create_session() -> ClientSession:
+    """Return a session with the connector tuned for the API host."""
+    connector = TCPConnector(
+        limit_per_host=CONNECTIONS_PER_HOST,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=DNS_CACHE_TTL,
+    )
+
+    return ClientSession(connector=connector)
+
+
+def _query_params(params: dict[str, Any]) -> dict[str, Any]:
+    """Drop unset query parameters and format dates."""
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in params.items()
+        if value is not None
+    }
+
+
+def _analytics_url(
+    profile_id: str,
+    analytics_type: str,
+    date_from: datetime | str | None,
+    date_to: datetime | str | None,
+) -> str:
+    """Return analytics URL, the date range is a part of the URL for caching."""
+    url = ENDPOINTS[ATTR_ANALYTICS].format(profile_id=profile_id, type=analytics_type)
+    if params := _query_params({"from": date_from, "to": date_to}):
+        return str(URL(url).with_query(params))
+
+    return url
+
+
+def _parse_retry_after(value: str | None) -> float:
+    """Return the delay in seconds from the Retry-After header value."""
+    if value is None:
+        return RETRY_AFTER
+    if value.isdigit():
+        return int(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return RETRY_AFTER
+
+    return max((retry_at - datetime.now(UTC)).total_seconds(), 0)
+
+
+def _parse_timestamp(value: str) -> int:
+    """Convert ISO 8601 date and time to microseconds since the epoch."""
+    return (datetime.fromisoformat(value) - _EPOCH) // _MICROSECOND
+
+
+def _parse_log_record(record: dict[str, Any]) -> LogEntry:
+    """Parse a log record from the JSON logs API."""
+    device = record.get("device") or {}
+    intern = sys.intern
+
+    return LogEntry(
+        timestamp=_parse_timestamp(record["timestamp"]),
+        dnssec=record.get("dnssec", False),
+        domain=intern(record["domain"]),
+        query_type=intern(record.get("type", "")),
+        protocol=intern(record.get("protocol", "")),
+        client_ip=intern(record.get("clientIp", "")),
+        status=intern(record.get("status", "")),
+        reasons=intern(",".join(reason["id"] for reason in record.get("reasons", []))),
+        destination_country="",
+        root_domain=intern(record.get("root", "")),
+        device_id=intern(device.get("id", "")),
+        device_name=intern(device.get("name", "")),
+        device_model=intern(device.get("model") or ""),
+        device_local_ip=intern(device.get("localIp") or ""),
+        matched_name="",
+        client_name=intern(record.get("client") or ""),
+    )
+
+
+def _parse_log_rows(text: str, columns: list[int]) -> Iterator[LogEntry]:
+    """Parse CSV logs, the header row fills the columns of log entry fields."""
+    for row in csv.reader(io.StringIO(text, newline="")):
+        if not columns:
+            columns.extend(
+                row.index(name) if name in row else len(row) for name in _LOG_FIELDS
+            )
+        elif row:
+            # Missing columns point past the end of the row, at an empty value
+            row.append("")
+            timestamp, dnssec, *values = (row[index] for index in columns)
+            yield LogEntry(
+                _parse_timestamp(timestamp),
+                dnssec == "true",
+                *map(sys.intern, values),
+            )
@@ -1,6 +1,7 @@
 """NextDNS constants."""
 
-from aiohttp import ClientTimeout
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
 
 from .model import (
     ApiNames,
@@ -11,6 +12,9 @@ from .model import (
     SettingDescription,
 )
 
+if TYPE_CHECKING:
+    from aiohttp import ClientTimeout
+
 API_ENDPOINT = "https://api.nextdns.io"
 
 ATTR_ANALYTICS = "analytics"
@@ -26,8 +30,10 @@ ATTR_PERFORMANCE = "performance"
 ATTR_PRIVACY = "privacy"
 ATTR_PROFILE = "profile"
 ATTR_PROFILES = "profiles"
+ATTR_QUERY_LOGS = "query_logs"
 ATTR_SECURITY = "security"
 ATTR_SETTINGS = "settings"
+ATTR_STREAM_LOGS = "stream_logs"
 ATTR_TEST = "test"
 
 ATTR_ANONYMIZED_ECS = "anonymized_ecs"
@@ -62,8 +68,6 @@ ATTR_BLOCK_BYPASS_METHODS = "block_bypass_methods"
 ATTR_SAFESEARCH = "safesearch"
 ATTR_YOUTUBE_RESTRICTED_MODE = "youtube_restricted_mode"
 
-PARENTAL_CONTROL_CATEGORIES = frozenset(ParentalControlCategoriesAttrs)
-PARENTAL_CONTROL_SERVICES = frozenset(ParentalControlServicesAttrs)
 
 _PROFILES = API_ENDPOINT + "/profiles/{profile_id}"
 
@@ -73,6 +77,8 @@ ENDPOINTS = {
     ATTR_GET_LOGS: _PROFILES + "/logs/download",
     ATTR_PROFILE: _PROFILES,
     ATTR_PROFILES: API_ENDPOINT + "/profiles",
+    ATTR_QUERY_LOGS: _PROFILES + "/logs",
+    ATTR_STREAM_LOGS: _PROFILES + "/logs/stream",
     ATTR_TEST: "https://{profile_id}.test.nextdns.io",
     ATTR_SECURITY: _PROFILES + "/security",
     ATTR_SETTINGS: _PROFILES + "/settings",
@@ -109,227 +115,307 @@ MAP_STATUS = {
     "relayed": "relayed_queries",
 }
 
-MAP_SETTING = {
-    ATTR_BLOCK_PAGE: SettingDescription(ENDPOINTS[ATTR_BLOCK_PAGE], ATTR_ENABLED),
-    ATTR_CACHE_BOOST: SettingDescription(
-        ENDPOINTS[ATTR_PERFORMANCE], ApiNames.CACHE_BOOST
-    ),
-    ATTR_CNAME_FLATTENING: SettingDescription(
-        ENDPOINTS[ATTR_PERFORMANCE], ApiNames.CNAME_FLATTENING
-    ),
-    ATTR_ANONYMIZED_ECS: SettingDescription(ENDPOINTS[ATTR_PERFORMANCE], ApiNames.ECS),
-    ATTR_BAV: SettingDescription(ENDPOINTS[ATTR_SETTINGS], ATTR_BAV),
-    ATTR_WEB3: SettingDescription(ENDPOINTS[ATTR_SETTINGS], ATTR_WEB3),
-    ATTR_LOGS: SettingDescription(ENDPOINTS[ATTR_LOGS], ATTR_ENABLED),
-    ATTR_LOGS_LOCATION: SettingDescription(ENDPOINTS[ATTR_LOGS], ATTR_LOCATION),
-    ATTR_LOGS_RETENTION: SettingDescription(ENDPOINTS[ATTR_LOGS], ATTR_RETENTION),
-    ATTR_ALLOW_AFFILIATE: SettingDescription(
-        ENDPOINTS[ATTR_PRIVACY], ApiNames.ALLOW_AFFILIATE
-    ),
-    ATTR_BLOCK_DISGUISED_TRACKERS: SettingDescription(
-        ENDPOINTS[ATTR_PRIVACY], ApiNames.DISGUISED_TRACKERS
-    ),
-    ATTR_AI_THREAT_DETECTION: SettingDescription(
-        ENDPOINTS[ATTR_SECURITY], ApiNames.AI_THREAT_DETECTION
-    ),
-    ATTR_BLOCK_CSAM: SettingDescription(ENDPOINTS[ATTR_SECURITY], ApiNames.CSAM),
-    ATTR_BLOCK_DDNS: SettingDescription(ENDPOINTS[ATTR_SECURITY], ApiNames.DDNS),
-    ATTR_BLOCK_NRD: SettingDescription(ENDPOINTS[ATTR_SECURITY], ApiNames.NRD),
-    ATTR_BLOCK_PARKED_DOMAINS: SettingDescription(
-        ENDPOINTS[ATTR_SECURITY], ApiNames.PARKING
-    ),
-    ATTR_CRYPTOJACKING_PROTECTION: SettingDescription(
-        ENDPOINTS[ATTR_SECURITY], ApiNames.CRYPTOJACKING
-    ),
-    ATTR_DGA_PROTECTION: SettingDescription(ENDPOINTS[ATTR_SECURITY], ApiNames.DGA),
-    ATTR_DNS_REBINDING_PROTECTION: SettingDescription(
-        ENDPOINTS[ATTR_SECURITY], ApiNames.DNS_REBINDING
-    ),
-    ATTR_GOOGLE_SAFE_BROWSING: SettingDescription(
-        ENDPOINTS[ATTR_SECURITY], ApiNames.GOOGLE_SAFE_BROWSING
-    ),
-    ATTR_IDN_HOMOGRAPH_ATTACKS_PROTECTION: SettingDescription(
-        ENDPOINTS[ATTR_SECURITY], ApiNames.IDN_HOMOGRAPHS
-    ),
-    ATTR_THREAT_INTELLIGENCE_FEEDS: SettingDescription(
-        ENDPOINTS[ATTR_SECURITY], ApiNames.THREAT_INTELLIGENCE_FEEDS
-    ),
-    ATTR_TYPOSQUATTING_PROTECTION: SettingDescription(
-        ENDPOINTS[ATTR_SECURITY], ApiNames.TYPOSQUATTING
-    ),
-    ATTR_BLOCK_BYPASS_METHODS: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL], ApiNames.BLOCK_BYPASS
-    ),
-    ATTR_SAFESEARCH: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL], ApiNames.SAFESEARCH
-    ),
-    ATTR_YOUTUBE_RESTRICTED_MODE: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL], ApiNames.YOUTUBE_RESTRICTED_MODE
-    ),
-    ParentalControlServicesAttrs.BLOCK_TIKTOK: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.TIKTOK
-    ),
-    ParentalControlServicesAttrs.BLOCK_TINDER: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.TINDER
-    ),
-    ParentalControlServicesAttrs.BLOCK_FACEBOOK: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.FACEBOOK
-    ),
-    ParentalControlServicesAttrs.BLOCK_SNAPCHAT: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.SNAPCHAT
-    ),
-    ParentalControlServicesAttrs.BLOCK_INSTAGRAM: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.INSTAGRAM
-    ),
-    ParentalControlServicesAttrs.BLOCK_FORTNITE: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.FORTNITE
-    ),
-    ParentalControlServicesAttrs.BLOCK_MESSENGER: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.MESSENGER
-    ),
-    ParentalControlServicesAttrs.BLOCK_LEAGUEOFLEGENDS: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE],
-        ParentalControlServices.LEAGUEOFLEGENDS,
-    ),
-    ParentalControlServicesAttrs.BLOCK_VK: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.VK
-    ),
-    ParentalControlServicesAttrs.BLOCK_9GAG: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.NINEGAG
-    ),
-    ParentalControlServicesAttrs.BLOCK_TUMBLR: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.TUMBLR
-    ),
-    ParentalControlServicesAttrs.BLOCK_ROBLOX: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.ROBLOX
-    ),
-    ParentalControlServicesAttrs.BLOCK_TWITCH: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.TWITCH
-    ),
-    ParentalControlServicesAttrs.BLOCK_MINECRAFT: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.MINECRAFT
-    ),
-    ParentalControlServicesAttrs.BLOCK_TWITTER: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.TWITTER
-    ),
-    ParentalControlServicesAttrs.BLOCK_DISCORD: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.DISCORD
-    ),
-    ParentalControlServicesAttrs.BLOCK_DAILYMOTION: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.DAILYMOTION
-    ),
-    ParentalControlServicesAttrs.BLOCK_PINTEREST: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.PINTEREST
-    ),
-    ParentalControlServicesAttrs.BLOCK_YOUTUBE: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.YOUTUBE
-    ),
-    ParentalControlServicesAttrs.BLOCK_STEAM: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.STEAM
-    ),
-    ParentalControlServicesAttrs.BLOCK_HULU: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.HULU
-    ),
-    ParentalControlServicesAttrs.BLOCK_WHATSAPP: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.WHATSAPP
-    ),
-    ParentalControlServicesAttrs.BLOCK_REDDIT: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.REDDIT
-    ),
-    ParentalControlServicesAttrs.BLOCK_BLIZZARD: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.BLIZZARD
-    ),
-    ParentalControlServicesAttrs.BLOCK_NETFLIX: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.NETFLIX
-    ),
-    ParentalControlServicesAttrs.BLOCK_IMGUR: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.IMGUR
-    ),
-    ParentalControlServicesAttrs.BLOCK_TELEGRAM: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.TELEGRAM
-    ),
-    ParentalControlServicesAttrs.BLOCK_DISNEYPLUS: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.DISNEYPLUS
-    ),
-    ParentalControlServicesAttrs.BLOCK_VIMEO: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.VIMEO
-    ),
-    ParentalControlServicesAttrs.BLOCK_SKYPE: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE],
-        ParentalControlServices.SKYPE,
-    ),
-    ParentalControlServicesAttrs.BLOCK_EBAY: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.EBAY
-    ),
-    ParentalControlServicesAttrs.BLOCK_SPOTIFY: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.SPOTIFY
-    ),
-    ParentalControlServicesAttrs.BLOCK_PRIMEVIDEO: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.PRIMEVIDEO
-    ),
-    ParentalControlServicesAttrs.BLOCK_ZOOM: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.ZOOM
-    ),
-    ParentalControlServicesAttrs.BLOCK_AMAZON: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.AMAZON
-    ),
-    ParentalControlServicesAttrs.BLOCK_XBOXLIVE: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.XBOXLIVE
-    ),
-    ParentalControlServicesAttrs.BLOCK_SIGNAL: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.SIGNAL
-    ),
-    ParentalControlServicesAttrs.BLOCK_BEREAL: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.BEREAL
-    ),
-    ParentalControlServicesAttrs.BLOCK_GOOGLE_CHAT: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.GOOGLE_CHAT
-    ),
-    ParentalControlServicesAttrs.BLOCK_CHATGPT: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.CHATGPT
-    ),
-    ParentalControlServicesAttrs.BLOCK_HBOMAX: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.HBOMAX
-    ),
-    ParentalControlServicesAttrs.BLOCK_MASTODON: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.MASTODON
-    ),
-    ParentalControlServicesAttrs.BLOCK_PLAYSTATION_NETWORK: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE],
-        ParentalControlServices.PLAYSTATION_NETWORK,
-    ),
-    ParentalControlCategoriesAttrs.BLOCK_DATING: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_CATEGORY], ParentalControlCategories.DATING
-    ),
-    ParentalControlCategoriesAttrs.BLOCK_GAMBLING: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_CATEGORY], ParentalControlCategories.GAMBLING
-    ),
-    ParentalControlCategoriesAttrs.BLOCK_PIRACY: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_CATEGORY], ParentalControlCategories.PIRACY
-    ),
-    ParentalControlCategoriesAttrs.BLOCK_PORN: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_CATEGORY], ParentalControlCategories.PORN
-    ),
-    ParentalControlCategoriesAttrs.BLOCK_SOCIAL_NETWORKS: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_CATEGORY],
-        ParentalControlCategories.SOCIAL_NETWORKS,
-    ),
-    ParentalControlCategoriesAttrs.BLOCK_VIDEO_STREAMING: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_CATEGORY],
-        ParentalControlCategories.VIDEO_STREAMING,
-    ),
-    ParentalControlCategoriesAttrs.BLOCK_ONLINE_GAMING: SettingDescription(
-        ENDPOINTS[ATTR_PARENTAL_CONTROL_CATEGORY],
-        ParentalControlCategories.ONLINE_GAMING,
-    ),
+MAP_ANALYTICS = {
+    "dnssec": ("validated", MAP_DNSSEC),
+    "encryption": ("encrypted", MAP_ENCRYPTED),
+    "ipVersions": ("version", MAP_IP_VERSIONS),
+    "protocols": ("protocol", MAP_PROTOCOLS),
+    "status": ("status", MAP_STATUS),
 }
 
+
+def _map_setting() -> dict[str, SettingDescription]:
+    """Return descriptions of the settings."""
+    return {
+        ATTR_BLOCK_PAGE: SettingDescription(ENDPOINTS[ATTR_BLOCK_PAGE], ATTR_ENABLED),
+        ATTR_CACHE_BOOST: SettingDescription(
+            ENDPOINTS[ATTR_PERFORMANCE], ApiNames.CACHE_BOOST
+        ),
+        ATTR_CNAME_FLATTENING: SettingDescription(
+            ENDPOINTS[ATTR_PERFORMANCE], ApiNames.CNAME_FLATTENING
+        ),
+        ATTR_ANONYMIZED_ECS: SettingDescription(
+            ENDPOINTS[ATTR_PERFORMANCE], ApiNames.ECS
+        ),
+        ATTR_BAV: SettingDescription(ENDPOINTS[ATTR_SETTINGS], ATTR_BAV),
+        ATTR_WEB3: SettingDescription(ENDPOINTS[ATTR_SETTINGS], ATTR_WEB3),
+        ATTR_LOGS: SettingDescription(ENDPOINTS[ATTR_LOGS], ATTR_ENABLED),
+        ATTR_LOGS_LOCATION: SettingDescription(ENDPOINTS[ATTR_LOGS], ATTR_LOCATION),
+        ATTR_LOGS_RETENTION: SettingDescription(ENDPOINTS[ATTR_LOGS], ATTR_RETENTION),
+        ATTR_ALLOW_AFFILIATE: SettingDescription(
+            ENDPOINTS[ATTR_PRIVACY], ApiNames.ALLOW_AFFILIATE
+        ),
+        ATTR_BLOCK_DISGUISED_TRACKERS: SettingDescription(
+            ENDPOINTS[ATTR_PRIVACY], ApiNames.DISGUISED_TRACKERS
+        ),
+        ATTR_AI_THREAT_DETECTION: SettingDescription(
+            ENDPOINTS[ATTR_SECURITY], ApiNames.AI_THREAT_DETECTION
+        ),
+        ATTR_BLOCK_CSAM: SettingDescription(ENDPOINTS[ATTR_SECURITY], ApiNames.CSAM),
+        ATTR_BLOCK_DDNS: SettingDescription(ENDPOINTS[ATTR_SECURITY], ApiNames.DDNS),
+        ATTR_BLOCK_NRD: SettingDescription(ENDPOINTS[ATTR_SECURITY], ApiNames.NRD),
+        ATTR_BLOCK_PARKED_DOMAINS: SettingDescription(
+            ENDPOINTS[ATTR_SECURITY], ApiNames.PARKING
+        ),
+        ATTR_CRYPTOJACKING_PROTECTION: SettingDescription(
+            ENDPOINTS[ATTR_SECURITY], ApiNames.CRYPTOJACKING
+        ),
+        ATTR_DGA_PROTECTION: SettingDescription(ENDPOINTS[ATTR_SECURITY], ApiNames.DGA),
+        ATTR_DNS_REBINDING_PROTECTION: SettingDescription(
+            ENDPOINTS[ATTR_SECURITY], ApiNames.DNS_REBINDING
+        ),
+        ATTR_GOOGLE_SAFE_BROWSING: SettingDescription(
+            ENDPOINTS[ATTR_SECURITY], ApiNames.GOOGLE_SAFE_BROWSING
+        ),
+        ATTR_IDN_HOMOGRAPH_ATTACKS_PROTECTION: SettingDescription(
+            ENDPOINTS[ATTR_SECURITY], ApiNames.IDN_HOMOGRAPHS
+        ),
+        ATTR_THREAT_INTELLIGENCE_FEEDS: SettingDescription(
+            ENDPOINTS[ATTR_SECURITY], ApiNames.THREAT_INTELLIGENCE_FEEDS
+        ),
+        ATTR_TYPOSQUATTING_PROTECTION: SettingDescription(
+            ENDPOINTS[ATTR_SECURITY], ApiNames.TYPOSQUATTING
+        ),
+        ATTR_BLOCK_BYPASS_METHODS: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL], ApiNames.BLOCK_BYPASS
+        ),
+        ATTR_SAFESEARCH: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL], ApiNames.SAFESEARCH
+        ),
+        ATTR_YOUTUBE_RESTRICTED_MODE: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL], ApiNames.YOUTUBE_RESTRICTED_MODE
+        ),
+        ParentalControlServicesAttrs.BLOCK_TIKTOK: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.TIKTOK
+        ),
+        ParentalControlServicesAttrs.BLOCK_TINDER: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.TINDER
+        ),
+        ParentalControlServicesAttrs.BLOCK_FACEBOOK: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.FACEBOOK
+        ),
+        ParentalControlServicesAttrs.BLOCK_SNAPCHAT: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.SNAPCHAT
+        ),
+        ParentalControlServicesAttrs.BLOCK_INSTAGRAM: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.INSTAGRAM
+        ),
+        ParentalControlServicesAttrs.BLOCK_FORTNITE: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.FORTNITE
+        ),
+        ParentalControlServicesAttrs.BLOCK_MESSENGER: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.MESSENGER
+        ),
+        ParentalControlServicesAttrs.BLOCK_LEAGUEOFLEGENDS: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE],
+            ParentalControlServices.LEAGUEOFLEGENDS,
+        ),
+        ParentalControlServicesAttrs.BLOCK_VK: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.VK
+        ),
+        ParentalControlServicesAttrs.BLOCK_9GAG: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.NINEGAG
+        ),
+        ParentalControlServicesAttrs.BLOCK_TUMBLR: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.TUMBLR
+        ),
+        ParentalControlServicesAttrs.BLOCK_ROBLOX: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.ROBLOX
+        ),
+        ParentalControlServicesAttrs.BLOCK_TWITCH: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.TWITCH
+        ),
+        ParentalControlServicesAttrs.BLOCK_MINECRAFT: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.MINECRAFT
+        ),
+        ParentalControlServicesAttrs.BLOCK_TWITTER: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.TWITTER
+        ),
+        ParentalControlServicesAttrs.BLOCK_DISCORD: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.DISCORD
+        ),
+        ParentalControlServicesAttrs.BLOCK_DAILYMOTION: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE],
+            ParentalControlServices.DAILYMOTION,
+        ),
+        ParentalControlServicesAttrs.BLOCK_PINTEREST: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.PINTEREST
+        ),
+        ParentalControlServicesAttrs.BLOCK_YOUTUBE: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.YOUTUBE
+        ),
+        ParentalControlServicesAttrs.BLOCK_STEAM: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.STEAM
+        ),
+        ParentalControlServicesAttrs.BLOCK_HULU: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.HULU
+        ),
+        ParentalControlServicesAttrs.BLOCK_WHATSAPP: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.WHATSAPP
+        ),
+        ParentalControlServicesAttrs.BLOCK_REDDIT: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.REDDIT
+        ),
+        ParentalControlServicesAttrs.BLOCK_BLIZZARD: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.BLIZZARD
+        ),
+        ParentalControlServicesAttrs.BLOCK_NETFLIX: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.NETFLIX
+        ),
+        ParentalControlServicesAttrs.BLOCK_IMGUR: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.IMGUR
+        ),
+        ParentalControlServicesAttrs.BLOCK_TELEGRAM: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.TELEGRAM
+        ),
+        ParentalControlServicesAttrs.BLOCK_DISNEYPLUS: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.DISNEYPLUS
+        ),
+        ParentalControlServicesAttrs.BLOCK_VIMEO: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.VIMEO
+        ),
+        ParentalControlServicesAttrs.BLOCK_SKYPE: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE],
+            ParentalControlServices.SKYPE,
+        ),
+        ParentalControlServicesAttrs.BLOCK_EBAY: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.EBAY
+        ),
+        ParentalControlServicesAttrs.BLOCK_SPOTIFY: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.SPOTIFY
+        ),
+        ParentalControlServicesAttrs.BLOCK_PRIMEVIDEO: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.PRIMEVIDEO
+        ),
+        ParentalControlServicesAttrs.BLOCK_ZOOM: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.ZOOM
+        ),
+        ParentalControlServicesAttrs.BLOCK_AMAZON: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.AMAZON
+        ),
+        ParentalControlServicesAttrs.BLOCK_XBOXLIVE: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.XBOXLIVE
+        ),
+        ParentalControlServicesAttrs.BLOCK_SIGNAL: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.SIGNAL
+        ),
+        ParentalControlServicesAttrs.BLOCK_BEREAL: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.BEREAL
+        ),
+        ParentalControlServicesAttrs.BLOCK_GOOGLE_CHAT: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE],
+            ParentalControlServices.GOOGLE_CHAT,
+        ),
+        ParentalControlServicesAttrs.BLOCK_CHATGPT: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.CHATGPT
+        ),
+        ParentalControlServicesAttrs.BLOCK_HBOMAX: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.HBOMAX
+        ),
+        ParentalControlServicesAttrs.BLOCK_MASTODON: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE], ParentalControlServices.MASTODON
+        ),
+        ParentalControlServicesAttrs.BLOCK_PLAYSTATION_NETWORK: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_SERVICE],
+            ParentalControlServices.PLAYSTATION_NETWORK,
+        ),
+        ParentalControlCategoriesAttrs.BLOCK_DATING: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_CATEGORY], ParentalControlCategories.DATING
+        ),
+        ParentalControlCategoriesAttrs.BLOCK_GAMBLING: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_CATEGORY],
+            ParentalControlCategories.GAMBLING,
+        ),
+        ParentalControlCategoriesAttrs.BLOCK_PIRACY: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_CATEGORY], ParentalControlCategories.PIRACY
+        ),
+        ParentalControlCategoriesAttrs.BLOCK_PORN: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_CATEGORY], ParentalControlCategories.PORN
+        ),
+        ParentalControlCategoriesAttrs.BLOCK_SOCIAL_NETWORKS: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_CATEGORY],
+            ParentalControlCategories.SOCIAL_NETWORKS,
+        ),
+        ParentalControlCategoriesAttrs.BLOCK_VIDEO_STREAMING: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_CATEGORY],
+            ParentalControlCategories.VIDEO_STREAMING,
+        ),
+        ParentalControlCategoriesAttrs.BLOCK_ONLINE_GAMING: SettingDescription(
+            ENDPOINTS[ATTR_PARENTAL_CONTROL_CATEGORY],
+            ParentalControlCategories.ONLINE_GAMING,
+        ),
+    }
+
+
 ALLOWED_LOGS_LOCATION = ("ch", "eu", "gb", "us")
 ALLOWED_LOGS_RETENTION = (1, 6, 24, 168, 720, 2160, 4320, 8760, 17520)
+ALLOWED_LOGS_STATUS = ("allowed", "blocked", "default", "error")
+LOGS_LIMIT = 100
+MAX_LOGS_LIMIT = 1000
+MIN_LOGS_LIMIT = 10
 
-TIMEOUT = ClientTimeout(total=5)
+PROFILE_CACHE_SIZE = 128
+SNAPSHOT_VERSION = 2
+VALIDATOR_CACHE_SIZE = 256
+URL_TEMPLATE_CACHE_SIZE = 1024
+STREAM_BUFFER_SIZE = 1000
+STREAM_RECONNECT_DELAY = 1
+LOGS_CHUNK_SIZE = 64 * 1024
 STOP_AFTER_ATTEMPT = 3
+RATE_LIMIT_ATTEMPTS = 5
+RETRY_AFTER = 5
+ROLLOUT_CONCURRENCY = 10
 WAIT_INCREMENT = 2
 WAIT_START = 2
 
 HTTP_STATUS_TIMEOUT = 524
+
+BACKOFF_RATIO = 0.5
+CONCURRENCY_LIMIT = 4
+LATENCY_SMOOTHING = 0.2
+LATENCY_TOLERANCE = 2
+MAX_CONCURRENCY_LIMIT = 64
+MIN_CONCURRENCY_LIMIT = 1
+
+CONNECTIONS_PER_HOST = 32
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 60
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _timeout(**kwargs: Any) -> "ClientTimeout":
+    """Return aiohttp client timeout."""
+    from aiohttp import ClientTimeout  # noqa: PLC0415
+
+    return ClientTimeout(**kwargs)
+
+
+if TYPE_CHECKING:
+    MAP_SETTING: dict[str, SettingDescription]
+    PARENTAL_CONTROL_CATEGORIES: frozenset[str]
+    PARENTAL_CONTROL_SERVICES: frozenset[str]
+    DOWNLOAD_TIMEOUT: ClientTimeout
+    STREAM_TIMEOUT: ClientTimeout
+    TIMEOUT: ClientTimeout
+
+# Built on first use, not to import aiohttp and build the tables on import
+_LAZY_CONSTANTS: dict[str, Callable[[], Any]] = {
+    # Downloads of large logs may take longer than TIMEOUT, only stalls abort them
+    "DOWNLOAD_TIMEOUT": lambda: _timeout(total=None, sock_connect=5, sock_read=30),
+    "MAP_SETTING": _map_setting,
+    "PARENTAL_CONTROL_CATEGORIES": lambda: frozenset(ParentalControlCategoriesAttrs),
+    "PARENTAL_CONTROL_SERVICES": lambda: frozenset(ParentalControlServicesAttrs),
+    # A connection dead without notice is reconnected after the read timeout
+    "STREAM_TIMEOUT": lambda: _timeout(total=None, sock_connect=5, sock_read=60),
+    "TIMEOUT": lambda: _timeout(total=5),
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Build the constant with the name on first use."""
+    if (factory := _LAZY_CONSTANTS.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = globals()[name] = factory()
+    return value
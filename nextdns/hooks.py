@@ -0,0 +1,48 @@
+"""Instrumentation hooks for NextDNS API wrapper."""
+
+import re
+from functools import cache, lru_cache
+
+from .const import ENDPOINTS, URL_TEMPLATE_CACHE_SIZE
+from .model import RequestEvent
+
+
+class RequestHooks:
+    """Hooks for request events, override the methods of the needed events."""
+
+    def on_request_start(self, event: RequestEvent) -> None:
+        """Call before the request is sent."""
+
+    def on_response(self, event: RequestEvent) -> None:
+        """Call when the response headers are received."""
+
+    def on_retry(self, event: RequestEvent) -> None:
+        """Call when the failed request is going to be sent again."""
+
+    def on_error(self, event: RequestEvent) -> None:
+        """Call when the request fails or the response has an error status."""
+
+
+@cache
+def _url_patterns() -> tuple[tuple[str, re.Pattern[str]], ...]:
+    """Return patterns of the endpoint URLs, the fields are named groups."""
+    return tuple(
+        (
+            template,
+            re.compile(
+                re.sub(r"\\\{(\w+)\\\}", r"(?P<\1>[^/?]+)", re.escape(template))
+            ),
+        )
+        for template in dict.fromkeys(ENDPOINTS.values())
+    )
+
+
+@lru_cache(maxsize=URL_TEMPLATE_CACHE_SIZE)
+def match_url_template(url: str) -> tuple[str, dict[str, str]]:
+    """Return the endpoint URL template and its fields for the URL."""
+    path, _, _ = url.partition("?")
+    for template, pattern in _url_patterns():
+        if match := pattern.fullmatch(path):
+            return template, match.groupdict()
+
+    return url, {}
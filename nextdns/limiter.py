@@ -0,0 +1,127 @@
+"""Request limiters for NextDNS API wrapper."""
+
+import asyncio
+from collections import deque
+from math import inf
+from time import monotonic
+
+from .const import (
+    BACKOFF_RATIO,
+    CONCURRENCY_LIMIT,
+    LATENCY_SMOOTHING,
+    LATENCY_TOLERANCE,
+    MAX_CONCURRENCY_LIMIT,
+    MIN_CONCURRENCY_LIMIT,
+)
+
+
+class RateLimiter:
+    """Token bucket limiting the rate of requests.
+
+    Share one instance between all clients using the same API key.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        """Initialize rate limiter, rate is the number of requests per second."""
+        self._interval = 1 / rate
+        self._tolerance = (burst - 1) * self._interval
+        self._arrival = 0.0
+        self._paused_until = 0.0
+
+    async def acquire(self) -> None:
+        """Wait until the next request can be sent."""
+        while True:
+            now = monotonic()
+            arrival = max(self._arrival, now)
+            start = max(arrival - self._tolerance, self._paused_until)
+            self._arrival = max(arrival, start) + self._interval
+
+            if (delay := start - monotonic()) > 0:
+                await asyncio.sleep(delay)
+            # Paused while waiting, the request needs a slot after the pause
+            if self._paused_until <= monotonic():
+                return
+
+    def pause(self, delay: float) -> None:
+        """Hold back all requests for the delay in seconds."""
+        self._paused_until = max(self._paused_until, monotonic() + delay)
+        # Requests after the pause are paced from its end, not sent at once
+        self._arrival = max(self._arrival, self._paused_until)
+
+
+class ConcurrencyLimiter:
+    """Adaptive limit of concurrent requests.
+
+    The limit grows by one per round trip of requests while latency is stable
+    and is cut down when the API is overloaded or latency rises (AIMD).
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = CONCURRENCY_LIMIT,
+        min_limit: int = MIN_CONCURRENCY_LIMIT,
+        max_limit: int = MAX_CONCURRENCY_LIMIT,
+    ) -> None:
+        """Initialize concurrency limiter."""
+        self._limit = float(initial_limit)
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._in_flight = 0
+        self._latency: float | None = None
+        self._decreased = -inf
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    @property
+    def limit(self) -> int:
+        """Return the current limit of concurrent requests."""
+        return int(self._limit)
+
+    async def acquire(self) -> float:
+        """Wait for a free slot and return the start time of the request."""
+        while self._in_flight >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                else:
+                    # The slot this waiter was woken up for goes to the next one
+                    self._wake_up()
+                raise
+
+        self._in_flight += 1
+
+        return monotonic()
+
+    def release(self, started: float, *, overloaded: bool = False) -> None:
+        """Free the slot and adjust the limit to the outcome of the request."""
+        self._in_flight -= 1
+        now = monotonic()
+        latency = now - started
+
+        if overloaded or (
+            self._latency is not None and latency > self._latency * LATENCY_TOLERANCE
+        ):
+            # Requests sent before the last decrease don't decrease it again
+            if started >= self._decreased:
+                self._limit = max(self._limit * BACKOFF_RATIO, self._min_limit)
+                self._decreased = now
+        else:
+            self._limit = min(self._limit + 1 / self._limit, self._max_limit)
+
+        if self._latency is None:
+            self._latency = latency
+        else:
+            self._latency += LATENCY_SMOOTHING * (latency - self._latency)
+
+        self._wake_up()
+
+    def _wake_up(self) -> None:
+        """Wake up waiters for the free slots."""
+        for _ in range(self.limit - self._in_flight):
+            if not self._waiters:
+                return
+            if not (waiter := self._waiters.popleft()).done():
+                waiter.set_result(None)
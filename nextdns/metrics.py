@@ -0,0 +1,180 @@
+"""Client metrics for NextDNS API wrapper."""
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+from http import HTTPStatus
+
+from .const import HTTP_STATUS_TIMEOUT, LATENCY_BUCKETS
+from .hooks import RequestHooks
+from .model import RequestEvent
+
+# Counters of the endpoint series, the index in the array, name and help text
+_REQUESTS = 0
+_RETRIES = 1
+_ERRORS = 2
+_TOO_MANY_REQUESTS = 3
+_TIMEOUTS = 4
+_SERVER_ERRORS = 5
+_SENT_BYTES = 6
+_RECEIVED_BYTES = 7
+_COUNTERS = (
+    ("requests_total", "Requests sent to the API."),
+    ("retries_total", "Requests sent again after a failure."),
+    ("errors_total", "Requests failed with an error."),
+    ("too_many_requests_total", "Responses with HTTP status 429."),
+    ("timeouts_total", "Responses with HTTP status 524."),
+    ("server_errors_total", "Responses with HTTP status 5xx."),
+    ("sent_bytes_total", "Bytes of request bodies."),
+    ("received_bytes_total", "Bytes of response bodies."),
+)
+_HITS = 0
+_MISSES = 1
+_PREFIX = "nextdns_"
+
+
+class _Series:
+    """Metrics of the requests with the same method and endpoint."""
+
+    __slots__ = ("buckets", "counters", "duration")
+
+    def __init__(self, buckets: int) -> None:
+        """Initialize, the last bucket counts durations above all bounds."""
+        self.buckets = array("Q", [0]) * (buckets + 1)
+        self.counters = array("Q", [0]) * len(_COUNTERS)
+        self.duration = array("d", [0.0])
+
+
+def _escape(value: str) -> str:
+    """Escape the label value for the Prometheus text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class ClientMetrics(RequestHooks):
+    """Metrics of the requests and caches of the NextDns client.
+
+    Series of an endpoint are created by its first request, the next requests
+    only update the preallocated arrays. The client records its own metrics
+    with the record methods, without creating an event for each request.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        """Initialize, buckets are the upper bounds of the latency histogram."""
+        self._buckets = tuple(sorted(buckets))
+        # Endpoint URL template -> method -> series
+        self._series: dict[str, dict[str, _Series]] = {}
+        self._caches: dict[str, array] = {}
+
+    def _get_series(self, method: str, url_template: str) -> _Series:
+        """Return the series for the method and endpoint of the request."""
+        if (methods := self._series.get(url_template)) is None:
+            methods = self._series[url_template] = {}
+        if (series := methods.get(method)) is None:
+            series = methods[method] = _Series(len(self._buckets))
+
+        return series
+
+    def record_request(self, method: str, url_template: str, bytes_sent: int) -> None:
+        """Count the request and its body."""
+        counters = self._get_series(method, url_template).counters
+        counters[_REQUESTS] += 1
+        counters[_SENT_BYTES] += bytes_sent
+
+    def record_response(
+        self,
+        method: str,
+        url_template: str,
+        elapsed: float | None,
+        status: int | None,
+        bytes_received: int | None,
+    ) -> None:
+        """Observe the latency and count the response by its status."""
+        series = self._get_series(method, url_template)
+        if elapsed is not None:
+            series.buckets[bisect_left(self._buckets, elapsed)] += 1
+            series.duration[0] += elapsed
+        if bytes_received is not None:
+            series.counters[_RECEIVED_BYTES] += bytes_received
+        if (status := status or 0) == HTTPStatus.TOO_MANY_REQUESTS:
+            series.counters[_TOO_MANY_REQUESTS] += 1
+        elif status >= HTTPStatus.INTERNAL_SERVER_ERROR:
+            series.counters[_SERVER_ERRORS] += 1
+            if status == HTTP_STATUS_TIMEOUT:
+                series.counters[_TIMEOUTS] += 1
+
+    def on_request_start(self, event: RequestEvent) -> None:
+        """Count the request and its body."""
+        self.record_request(event.method, event.url_template, event.bytes_sent)
+
+    def on_response(self, event: RequestEvent) -> None:
+        """Observe the latency and count the response by its status."""
+        self.record_response(
+            event.method,
+            event.url_template,
+            event.elapsed,
+            event.status,
+            event.bytes_received,
+        )
+
+    def on_retry(self, event: RequestEvent) -> None:
+        """Count the retry."""
+        self._get_series(event.method, event.url_template).counters[_RETRIES] += 1
+
+    def on_error(self, event: RequestEvent) -> None:
+        """Count the error."""
+        self._get_series(event.method, event.url_template).counters[_ERRORS] += 1
+
+    def record_cache(self, cache: str, *, hit: bool) -> None:
+        """Count a lookup in the cache with the name."""
+        if (lookups := self._caches.get(cache)) is None:
+            lookups = self._caches[cache] = array("Q", [0, 0])
+        lookups[_HITS if hit else _MISSES] += 1
+
+    def cache_hit_ratio(self, cache: str) -> float | None:
+        """Return the ratio of hits of the cache or None without lookups."""
+        if (lookups := self._caches.get(cache)) is None:
+            return None
+
+        return lookups[_HITS] / (lookups[_HITS] + lookups[_MISSES])
+
+    def render(self) -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        series = [
+            (f'endpoint="{_escape(endpoint)}",method="{_escape(method)}"', values)
+            for endpoint, methods in sorted(self._series.items())
+            for method, values in sorted(methods.items())
+        ]
+        bounds = [*(str(float(bound)) for bound in self._buckets), "+Inf"]
+        name = f"{_PREFIX}request_duration_seconds"
+        lines = [
+            f"# HELP {name} Time until the response headers are received.",
+            f"# TYPE {name} histogram",
+        ]
+        for labels, values in series:
+            count = 0
+            for bound, bucket in zip(bounds, values.buckets, strict=True):
+                count += bucket
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {values.duration[0]}")
+            lines.append(f"{name}_count{{{labels}}} {count}")
+
+        for index, (counter, help_text) in enumerate(_COUNTERS):
+            name = f"{_PREFIX}{counter}"
+            lines.extend((f"# HELP {name} {help_text}", f"# TYPE {name} counter"))
+            lines.extend(
+                f"{name}{{{labels}}} {values.counters[index]}"
+                for labels, values in series
+            )
+
+        for counter, index, help_text in (
+            ("cache_hits_total", _HITS, "Lookups found in the cache."),
+            ("cache_misses_total", _MISSES, "Lookups not found in the cache."),
+        ):
+            name = f"{_PREFIX}{counter}"
+            lines.extend((f"# HELP {name} {help_text}", f"# TYPE {name} counter"))
+            lines.extend(
+                f'{name}{{cache="{_escape(cache)}"}} {lookups[index]}'
+                for cache, lookups in sorted(self._caches.items())
+            )
+
+        return "\n".join(lines) + "\n"
@@ -1,8 +1,10 @@
 """Type definitions for NextDNS."""
 
-from dataclasses import dataclass
+from array import array
+from dataclasses import dataclass, fields
 from enum import StrEnum
-from typing import Any
+from operator import attrgetter
+from typing import Any, Self
 
 
 def _ratio(queries: int, total: int) -> float:
@@ -10,12 +12,12 @@ def _ratio(queries: int, total: int) -> float:
     return 0.0 if not total else round(queries / total * 100, 1)
 
 
-@dataclass
+@dataclass(slots=True)
 class NextDnsData:
     """NextDNS data class."""
 
 
-@dataclass
+@dataclass(slots=True)
 class AnalyticsStatus(NextDnsData):
     """AnalyticsStatus class."""
 
@@ -37,7 +39,7 @@ class AnalyticsStatus(NextDnsData):
         self.blocked_queries_ratio = _ratio(self.blocked_queries, self.all_queries)
 
 
-@dataclass
+@dataclass(slots=True)
 class AnalyticsDnssec(NextDnsData):
     """AnalyticsDnssec class."""
 
@@ -51,7 +53,7 @@ class AnalyticsDnssec(NextDnsData):
         self.validated_queries_ratio = _ratio(self.validated_queries, all_queries)
 
 
-@dataclass
+@dataclass(slots=True)
 class AnalyticsEncryption(NextDnsData):
     """AnalyticsEncryption class."""
 
@@ -65,7 +67,7 @@ class AnalyticsEncryption(NextDnsData):
         self.encrypted_queries_ratio = _ratio(self.encrypted_queries, all_queries)
 
 
-@dataclass
+@dataclass(slots=True)
 class AnalyticsIpVersions(NextDnsData):
     """AnalyticsIpVersions class."""
 
@@ -79,7 +81,7 @@ class AnalyticsIpVersions(NextDnsData):
         self.ipv6_queries_ratio = _ratio(self.ipv6_queries, all_queries)
 
 
-@dataclass
+@dataclass(slots=True)
 class AnalyticsProtocols(NextDnsData):
     """AnalyticsProtocols class."""
 
@@ -114,7 +116,7 @@ class AnalyticsProtocols(NextDnsData):
         self.udp_queries_ratio = _ratio(self.udp_queries, all_queries)
 
 
-@dataclass
+@dataclass(slots=True)
 class AllAnalytics(NextDnsData):
     """AllAnalytics class."""
 
@@ -125,7 +127,20 @@ class AllAnalytics(NextDnsData):
     status: AnalyticsStatus
 
 
-@dataclass
+@dataclass(slots=True)
+class AnalyticsSeries(NextDnsData):
+    """AnalyticsSeries class, times in seconds since the epoch."""
+
+    interval: int
+    times: array
+    queries: dict[str, array]
+
+    def __len__(self) -> int:
+        """Return the number of points."""
+        return len(self.times)
+
+
+@dataclass(slots=True)
 class Profile(NextDnsData):
     """Profile class."""
 
@@ -142,7 +157,7 @@ class Profile(NextDnsData):
     setup: dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True)
 class Settings(NextDnsData):
     """Settings class."""
 
@@ -229,7 +244,56 @@ class Settings(NextDnsData):
     block_video_streaming: bool
 
 
-@dataclass
+_SETTINGS_FLAGS = tuple(field.name for field in fields(Settings) if field.type is bool)
+_get_settings_flags = attrgetter(*_SETTINGS_FLAGS)
+
+
+@dataclass(frozen=True, slots=True)
+class PackedSettings:
+    """PackedSettings class, boolean settings are bits of flags."""
+
+    flags: int
+    logs_location: str
+    logs_retention: int
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Self:
+        """Pack settings."""
+        flags = 0
+        for bit, value in enumerate(_get_settings_flags(settings)):
+            flags |= value << bit
+
+        return cls(flags, settings.logs_location, settings.logs_retention)
+
+    def to_settings(self) -> Settings:
+        """Unpack settings."""
+        return Settings(
+            **{
+                name: bool(self.flags >> bit & 1)
+                for bit, name in enumerate(_SETTINGS_FLAGS)
+            },
+            logs_location=self.logs_location,
+            logs_retention=self.logs_retention,
+        )
+
+    def diff(self, other: Self) -> list[str]:
+        """Return names of the settings with different values."""
+        changed = []
+        if self.logs_location != other.logs_location:
+            changed.append("logs_location")
+        if self.logs_retention != other.logs_retention:
+            changed.append("logs_retention")
+
+        flags = self.flags ^ other.flags
+        while flags:
+            lowest = flags & -flags
+            changed.append(_SETTINGS_FLAGS[lowest.bit_length() - 1])
+            flags ^= lowest
+
+        return changed
+
+
+@dataclass(slots=True)
 class ProfileInfo(NextDnsData):
     """ProfileInfo class."""
 
@@ -238,7 +302,7 @@ class ProfileInfo(NextDnsData):
     name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ConnectionStatus(NextDnsData):
     """ConnectionStatus class."""
 
@@ -246,6 +310,54 @@ class ConnectionStatus(NextDnsData):
     profile_id: str | None = None
 
 
+@dataclass(slots=True)
+class RequestEvent(NextDnsData):
+    """RequestEvent class, started is monotonic time, elapsed is in seconds."""
+
+    method: str
+    url: str
+    url_template: str
+    url_params: dict[str, str]
+    attempt: int
+    started: float
+    bytes_sent: int = 0
+    elapsed: float | None = None
+    status: int | None = None
+    bytes_received: int | None = None
+    error: Exception | None = None
+
+
+@dataclass(slots=True)
+class RolloutResult(NextDnsData):
+    """RolloutResult class."""
+
+    profile_id: str
+    success: bool
+    error: Exception | None = None
+
+
+@dataclass(slots=True)
+class LogEntry(NextDnsData):
+    """LogEntry class, timestamp in microseconds since the epoch."""
+
+    timestamp: int
+    dnssec: bool
+    domain: str
+    query_type: str
+    protocol: str
+    client_ip: str
+    status: str
+    reasons: str
+    destination_country: str
+    root_domain: str
+    device_id: str
+    device_name: str
+    device_model: str
+    device_local_ip: str
+    matched_name: str
+    client_name: str
+
+
 class ParentalControlServices(StrEnum):
     """Service type for parental control."""
 
@@ -393,7 +505,7 @@ class ApiNames(StrEnum):
     YOUTUBE_RESTRICTED_MODE = "youtubeRestrictedMode"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SettingDescription:
     """SettingDescription class."""
 
@@ -0,0 +1,73 @@
+"""Incremental analytics poller for NextDNS API wrapper."""
+
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+from .const import MAP_DNSSEC, MAP_ENCRYPTED, MAP_IP_VERSIONS, MAP_PROTOCOLS, MAP_STATUS
+from .model import (
+    AllAnalytics,
+    AnalyticsDnssec,
+    AnalyticsEncryption,
+    AnalyticsIpVersions,
+    AnalyticsProtocols,
+    AnalyticsStatus,
+)
+
+if TYPE_CHECKING:
+    from .client import NextDns
+
+_ANALYTICS: tuple[tuple[str, type[Any], dict[Any, str]], ...] = (
+    ("dnssec", AnalyticsDnssec, MAP_DNSSEC),
+    ("encryption", AnalyticsEncryption, MAP_ENCRYPTED),
+    ("ip_versions", AnalyticsIpVersions, MAP_IP_VERSIONS),
+    ("protocols", AnalyticsProtocols, MAP_PROTOCOLS),
+    ("status", AnalyticsStatus, MAP_STATUS),
+)
+
+
+class AnalyticsPoller:
+    """Poll profile analytics, fetching only the window since the last poll."""
+
+    def __init__(self, nextdns: "NextDns") -> None:
+        """Initialize."""
+        self._nextdns = nextdns
+        self._last_poll: dict[str, datetime] = {}
+        self._totals: dict[str, AllAnalytics] = {}
+
+    async def poll(
+        self, profile_id: str, date_to: datetime | None = None
+    ) -> AllAnalytics:
+        """Fetch new analytics and return running totals for the profile.
+
+        The first poll fetches the default analytics window, the next ones only
+        the time between the previous poll and date_to, by default now.
+        """
+        if date_to is None:
+            date_to = datetime.now(UTC)
+
+        new = await self._nextdns.get_all_analytics(
+            profile_id, date_from=self._last_poll.get(profile_id), date_to=date_to
+        )
+        self._last_poll[profile_id] = date_to
+
+        if (totals := self._totals.get(profile_id)) is not None:
+            new = AllAnalytics(
+                *(
+                    cls(
+                        **{
+                            key: getattr(getattr(totals, name), key)
+                            + getattr(getattr(new, name), key)
+                            for key in mapping.values()
+                        }
+                    )
+                    for name, cls, mapping in _ANALYTICS
+                )
+            )
+        self._totals[profile_id] = new
+
+        return new
+
+    def reset(self, profile_id: str) -> None:
+        """Forget running totals, the next poll fetches the default window."""
+        self._last_poll.pop(profile_id, None)
+        self._totals.pop(profile_id, None)
@@ -0,0 +1,652 @@
+"""Fake NextDNS API server for testing and load testing.
+
+The server keeps profiles and logs in memory and serves the endpoints used by
+the NextDns client, with configurable latency and injected errors:
+
+    async with FakeNextDnsServer(latency=0.05) as server:
+        server.add_profile("abc123", "Home")
+        server.generate_logs("abc123", 10_000)
+        async with server.session() as session:
+            nextdns = await NextDns.create(session, "apikey")
+"""
+
+import asyncio
+import csv
+import io
+import json
+import re
+from collections import Counter, deque
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from http import HTTPStatus
+from operator import itemgetter
+from random import Random
+from typing import Any, Self
+
+from aiohttp import ClientHandlerType, ClientRequest, ClientResponse, ClientSession, web
+from aiohttp.test_utils import TestServer
+from yarl import URL
+
+from .const import (
+    API_ENDPOINT,
+    ATTR_TEST,
+    ENDPOINTS,
+    HTTP_STATUS_TIMEOUT,
+    LOGS_LIMIT,
+    MAP_PROTOCOLS,
+)
+
+_API_HOST = URL(API_ENDPOINT).host
+_TEST_HOST = ENDPOINTS[ATTR_TEST].removeprefix("https://{profile_id}")
+_RELATIVE_DATE = re.compile(r"-(\d+)([smhdw])")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+_LOG_COLUMNS = (
+    "timestamp",
+    "domain",
+    "query_type",
+    "dnssec",
+    "protocol",
+    "client_ip",
+    "status",
+    "reasons",
+    "destination_country",
+    "root_domain",
+    "device_id",
+    "device_name",
+    "device_model",
+    "device_local_ip",
+    "matched_name",
+    "client_name",
+)
+_DOMAINS = (
+    ("www.example.com", "example.com"),
+    ("api.nextdns.io", "nextdns.io"),
+    ("sync.services.mozilla.com", "mozilla.com"),
+    ("gateway.icloud.com", "icloud.com"),
+    ("www.google.com", "google.com"),
+    ("github.com", "github.com"),
+    ("ads.doubleclick.net", "doubleclick.net"),
+    ("tracker.adnxs.com", "adnxs.com"),
+)
+_CLIENT_IPS = ("10.10.10.10", "192.168.1.20", "2001:db8::10")
+_DEVICES = (
+    {"id": "8M05S", "name": "Laptop", "model": "macOS"},
+    {"id": "D2ZX1", "name": "Phone", "model": "iPhone"},
+)
+_QUERY_TYPES = ("A", "AAAA", "HTTPS")
+# Status of generated logs with their weights
+_STATUSES = {"default": 80, "blocked": 15, "allowed": 5}
+_UNENCRYPTED_PROTOCOLS = ("TCP", "UDP")
+
+# Analytics type -> key of the items, value of a log record
+_ANALYTICS: dict[str, tuple[str, Callable[[dict[str, Any]], Any]]] = {
+    "dnssec": ("validated", itemgetter("dnssec")),
+    "encryption": ("encrypted", itemgetter("encrypted")),
+    "ipVersions": ("version", lambda record: 6 if ":" in record["clientIp"] else 4),
+    "protocols": ("protocol", itemgetter("protocol")),
+    "status": ("status", itemgetter("status")),
+}
+
+
+def _profile_data(profile_id: str, name: str, fingerprint: str) -> dict[str, Any]:
+    """Return data of a new profile in the API format."""
+    return {
+        "id": profile_id,
+        "fingerprint": fingerprint,
+        "name": name,
+        "setup": {
+            "ipv4": [],
+            "ipv6": [],
+            "linkedIp": {"servers": [], "ip": None, "ddns": None, "updateToken": None},
+            "dnscrypt": None,
+        },
+        "security": {
+            "threatIntelligenceFeeds": True,
+            "aiThreatDetection": True,
+            "googleSafeBrowsing": True,
+            "cryptojacking": True,
+            "dnsRebinding": True,
+            "idnHomographs": True,
+            "typosquatting": True,
+            "dga": True,
+            "nrd": False,
+            "ddns": False,
+            "parking": True,
+            "csam": True,
+            "tlds": [],
+        },
+        "privacy": {
+            "disguisedTrackers": True,
+            "allowAffiliate": True,
+            "blocklists": [],
+            "natives": [],
+        },
+        "parentalControl": {
+            "safeSearch": False,
+            "youtubeRestrictedMode": False,
+            "blockBypass": False,
+            "services": [],
+            "categories": [],
+            "recreation": {"times": {}, "timezone": None},
+        },
+        "settings": {
+            "logs": {
+                "enabled": True,
+                "drop": {"ip": False, "domain": False},
+                "retention": 7776000,
+                "location": "eu",
+            },
+            "blockPage": {"enabled": False},
+            "performance": {"ecs": True, "cacheBoost": True, "cnameFlattening": True},
+            "bav": False,
+            "web3": False,
+        },
+        "denylist": [],
+        "allowlist": [],
+        "rewrites": [],
+    }
+
+
+def _error(status: int, code: str, detail: str | None = None) -> web.Response:
+    """Return an error response in the API format."""
+    error = {"code": code} if detail is None else {"code": code, "detail": detail}
+
+    return web.json_response({"errors": [error]}, status=status)
+
+
+def _parse_date(value: str | None, now: datetime) -> datetime | None:
+    """Parse an ISO 8601 or relative date like -1d of a query parameter."""
+    if value is None:
+        return None
+    if value == "now":
+        return now
+    if match := _RELATIVE_DATE.fullmatch(value):
+        return now - timedelta(seconds=int(match[1]) * _UNITS[match[2]])
+
+    date = datetime.fromisoformat(value)
+
+    return date if date.tzinfo is not None else date.replace(tzinfo=UTC)
+
+
+def _format_date(date: datetime) -> str:
+    """Format the date like the API."""
+    return date.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _merge(target: dict[str, Any], data: dict[str, Any]) -> None:
+    """Update the target with the data, nested objects are updated too."""
+    for key, value in data.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = value
+
+
+def _resolve(node: Any, path: list[str]) -> Any:
+    """Return the object at the path, items of lists are found by their ID."""
+    for segment in path:
+        if isinstance(node, list):
+            node = next((item for item in node if item.get("id") == segment), None)
+        elif isinstance(node, dict):
+            node = node.get(segment)
+        if not isinstance(node, dict | list):
+            return None
+
+    return node
+
+
+class FakeNextDnsServer:
+    """Stateful NextDNS API served by a local HTTP server.
+
+    Requests of sessions created by session() are sent to this server. The
+    latency of responses is latency plus a random part up to latency_jitter
+    seconds. Random responses get HTTP 429 and 524 with the given rates,
+    seed makes them and the generated logs reproducible.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        api_key: str | None = None,
+        latency: float = 0,
+        latency_jitter: float = 0,
+        too_many_requests_rate: float = 0,
+        timeout_rate: float = 0,
+        retry_after: int = 1,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize, requests with another API key get HTTP 403 if it is set."""
+        self._api_key = api_key
+        self._latency = latency
+        self._latency_jitter = latency_jitter
+        self._too_many_requests_rate = too_many_requests_rate
+        self._timeout_rate = timeout_rate
+        self._retry_after = retry_after
+        self._random = Random(seed)  # noqa: S311
+        self._injected: deque[int] = deque()
+        self._profiles: dict[str, dict[str, Any]] = {}
+        # Profile ID -> log records in chronological order with their timestamps
+        self._logs: dict[str, list[tuple[datetime, dict[str, Any]]]] = {}
+        self._logs_added = asyncio.Event()
+        self._closing = False
+        self._server: TestServer | None = None
+        self.requests = 0
+
+        self._app = web.Application(middlewares=(self._faults,))
+        self._app.router.add_get("/profiles", self._get_profiles)
+        self._app.router.add_get("/profiles/{profile_id}", self._get_profile)
+        self._app.router.add_get(
+            "/profiles/{profile_id}/analytics/{type}", self._get_analytics
+        )
+        self._app.router.add_get("/profiles/{profile_id}/logs", self._get_logs)
+        self._app.router.add_delete("/profiles/{profile_id}/logs", self._clear_logs)
+        self._app.router.add_get(
+            "/profiles/{profile_id}/logs/download", self._download_logs
+        )
+        self._app.router.add_get(
+            "/profiles/{profile_id}/logs/stream", self._stream_logs
+        )
+        self._app.router.add_get("/test/{profile_id}", self._test)
+        self._app.router.add_patch("/profiles/{profile_id}/{path:.+}", self._patch)
+        self._app.router.add_post("/profiles/{profile_id}/{path:.+}", self._post)
+        self._app.router.add_delete("/profiles/{profile_id}/{path:.+}", self._delete)
+
+    @property
+    def app(self) -> web.Application:
+        """Return the web application, to run it with another runner."""
+        return self._app
+
+    @property
+    def profiles(self) -> dict[str, dict[str, Any]]:
+        """Return data of the profiles by ID in the API format."""
+        return self._profiles
+
+    async def start(self) -> None:
+        """Start the server on a free port of the local host."""
+        self._closing = False
+        self._server = TestServer(self._app)
+        await self._server.start_server()
+
+    async def close(self) -> None:
+        """Stop the server, open log streams are closed."""
+        self._closing = True
+        self._logs_added.set()
+        if self._server is not None:
+            await self._server.close()
+            self._server = None
+
+    async def __aenter__(self) -> Self:
+        """Start the server."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Stop the server."""
+        await self.close()
+
+    def make_url(self, path: str) -> URL:
+        """Return the URL of the path on the local server."""
+        if self._server is None:
+            raise RuntimeError("The server is not started")
+
+        return self._server.make_url(path)
+
+    def session(self, **kwargs: Any) -> ClientSession:
+        """Return a session sending requests for the API to this server."""
+
+        async def redirect(
+            request: ClientRequest, handler: ClientHandlerType
+        ) -> ClientResponse:
+            host = request.url.host or ""
+            if host == _API_HOST:
+                request.url = self.make_url(request.url.path_qs)
+            elif host.endswith(_TEST_HOST):
+                profile_id = host.removesuffix(_TEST_HOST)
+                request.url = self.make_url(f"/test/{profile_id}")
+            return await handler(request)
+
+        middlewares = (*kwargs.pop("middlewares", ()), redirect)
+
+        return ClientSession(middlewares=middlewares, **kwargs)
+
+    def add_profile(
+        self, profile_id: str, name: str, fingerprint: str | None = None
+    ) -> dict[str, Any]:
+        """Add a profile with default settings and return its data."""
+        self._profiles[profile_id] = _profile_data(
+            profile_id, name, fingerprint or f"{profile_id}fp"
+        )
+        self._logs.setdefault(profile_id, [])
+
+        return self._profiles[profile_id]
+
+    def inject(self, status: int, count: int = 1) -> None:
+        """Answer the next requests with the HTTP status."""
+        self._injected.extend([status] * count)
+
+    def generate_logs(
+        self,
+        profile_id: str,
+        count: int,
+        *,
+        start: datetime | None = None,
+        interval: float = 1,
+    ) -> None:
+        """Add random log records for queries every interval seconds.
+
+        By default the last record is timestamped now.
+        """
+        if start is None:
+            start = datetime.now(UTC) - timedelta(seconds=interval * (count - 1))
+
+        logs = self._logs.setdefault(profile_id, [])
+        choice = self._random.choice
+        statuses = self._random.choices(
+            list(_STATUSES), weights=list(_STATUSES.values()), k=count
+        )
+        for index, status in enumerate(statuses):
+            timestamp = start + timedelta(seconds=interval * index)
+            domain, root = choice(_DOMAINS)
+            protocol = choice(tuple(MAP_PROTOCOLS))
+            record = {
+                "timestamp": _format_date(timestamp),
+                "domain": domain,
+                "root": root,
+                "type": choice(_QUERY_TYPES),
+                "dnssec": self._random.random() < 0.1,  # noqa: PLR2004
+                "encrypted": protocol not in _UNENCRYPTED_PROTOCOLS,
+                "protocol": protocol,
+                "clientIp": choice(_CLIENT_IPS),
+                "client": None,
+                "device": choice(_DEVICES),
+                "status": status,
+                "reasons": (
+                    [{"id": "blocklist:oisd", "name": "OISD"}]
+                    if status == "blocked"
+                    else []
+                ),
+            }
+            logs.append((timestamp, record))
+
+        self._logs_added.set()
+        self._logs_added = asyncio.Event()
+
+    @web.middleware
+    async def _faults(
+        self,
+        request: web.Request,
+        handler: Callable[[web.Request], Any],
+    ) -> web.StreamResponse:
+        """Delay the response and answer with the injected errors."""
+        self.requests += 1
+        if self._latency or self._latency_jitter:
+            await asyncio.sleep(
+                self._latency + self._random.uniform(0, self._latency_jitter)
+            )
+
+        if self._injected:
+            status = self._injected.popleft()
+        elif self._random.random() < self._too_many_requests_rate:
+            status = HTTPStatus.TOO_MANY_REQUESTS
+        elif self._random.random() < self._timeout_rate:
+            status = HTTP_STATUS_TIMEOUT
+        elif (
+            self._api_key is not None
+            and request.headers.get("X-Api-Key") != self._api_key
+        ):
+            status = HTTPStatus.FORBIDDEN
+        else:
+            return await handler(request)
+
+        if status == HTTPStatus.TOO_MANY_REQUESTS:
+            response = _error(status, "tooManyRequests")
+            response.headers["Retry-After"] = str(self._retry_after)
+            return response
+        if status == HTTP_STATUS_TIMEOUT:
+            return web.Response(status=status, text="Timeout Error")
+        if status == HTTPStatus.FORBIDDEN:
+            return web.Response(status=status)
+
+        return _error(status, "injected")
+
+    def _profile(self, request: web.Request) -> dict[str, Any]:
+        """Return data of the profile of the request."""
+        profile_id = request.match_info["profile_id"]
+        if (profile := self._profiles.get(profile_id)) is None:
+            raise web.HTTPNotFound(
+                text=json.dumps({"errors": [{"code": "notFound"}]}),
+                content_type="application/json",
+            )
+
+        return profile
+
+    def _records(self, request: web.Request) -> list[dict[str, Any]]:
+        """Return log records of the profile within the dates of the request."""
+        self._profile(request)
+        now = datetime.now(UTC)
+        try:
+            date_from = _parse_date(request.query.get("from"), now)
+            date_to = _parse_date(request.query.get("to"), now)
+        except ValueError as error:
+            raise web.HTTPBadRequest(
+                text=json.dumps(
+                    {"errors": [{"code": "invalid", "detail": str(error)}]}
+                ),
+                content_type="application/json",
+            ) from error
+
+        return [
+            record
+            for timestamp, record in self._logs[request.match_info["profile_id"]]
+            if (date_from is None or timestamp >= date_from)
+            and (date_to is None or timestamp < date_to)
+        ]
+
+    async def _get_profiles(self, _: web.Request) -> web.Response:
+        """Return the list of profiles."""
+        return web.json_response(
+            {
+                "data": [
+                    {key: profile[key] for key in ("id", "fingerprint", "name")}
+                    for profile in self._profiles.values()
+                ]
+            }
+        )
+
+    async def _get_profile(self, request: web.Request) -> web.Response:
+        """Return the profile."""
+        return web.json_response({"data": self._profile(request)})
+
+    async def _get_analytics(self, request: web.Request) -> web.Response:
+        """Return analytics of the logs, or its time series."""
+        analytics_type, _, series = request.match_info["type"].partition(";")
+        if analytics_type not in _ANALYTICS or series not in ("", "series"):
+            return _error(HTTPStatus.NOT_FOUND, "notFound")
+
+        key, get_value = _ANALYTICS[analytics_type]
+        records = self._records(request)
+        counter = Counter(get_value(record) for record in records)
+        if not series:
+            return web.json_response(
+                {
+                    "data": [
+                        {key: value, "queries": queries}
+                        for value, queries in counter.most_common()
+                    ],
+                    "meta": {"pagination": {"cursor": None}},
+                }
+            )
+
+        interval = int(request.query.get("interval", 86400))
+        now = datetime.now(UTC)
+        start = _parse_date(request.query.get("from"), now) or (
+            datetime.fromisoformat(records[0]["timestamp"]) if records else now
+        )
+        end = _parse_date(request.query.get("to"), now) or now
+        start = datetime.fromtimestamp(start.timestamp() // interval * interval, tz=UTC)
+        size = max(int((end - start).total_seconds() // interval) + 1, 1)
+        queries = {value: [0] * size for value in counter}
+        for record in records:
+            timestamp = datetime.fromisoformat(record["timestamp"])
+            index = int((timestamp - start).total_seconds() // interval)
+            queries[get_value(record)][min(index, size - 1)] += 1
+
+        return web.json_response(
+            {
+                "data": [
+                    {key: value, "queries": queries[value]}
+                    for value, _ in counter.most_common()
+                ],
+                "meta": {
+                    "series": {
+                        "times": [
+                            _format_date(start + timedelta(seconds=interval * index))
+                            for index in range(size)
+                        ],
+                        "interval": interval,
+                    }
+                },
+            }
+        )
+
+    async def _get_logs(self, request: web.Request) -> web.Response:
+        """Return a page of the logs, the newest first."""
+        query = request.query
+        records = [
+            record
+            for record in reversed(self._records(request))
+            if query.get("status") in (None, record["status"])
+            and query.get("device") in (None, record["device"]["id"])
+            and query.get("search", "") in record["domain"]
+        ]
+        start = int(query.get("cursor", 0))
+        end = start + int(query.get("limit", LOGS_LIMIT))
+
+        return web.json_response(
+            {
+                "data": records[start:end],
+                "meta": {
+                    "pagination": {"cursor": str(end) if end < len(records) else None}
+                },
+            }
+        )
+
+    async def _clear_logs(self, request: web.Request) -> web.Response:
+        """Remove the logs of the profile."""
+        self._profile(request)
+        self._logs[request.match_info["profile_id"]] = []
+
+        return web.Response(status=HTTPStatus.NO_CONTENT)
+
+    async def _download_logs(self, request: web.Request) -> web.Response:
+        """Return the logs as CSV, the newest first."""
+        output = io.StringIO()
+        writer = csv.writer(output, lineterminator="\n")
+        writer.writerow(_LOG_COLUMNS)
+        for record in reversed(self._records(request)):
+            device = record["device"]
+            writer.writerow(
+                (
+                    record["timestamp"].replace("Z", "+00:00"),
+                    record["domain"],
+                    record["type"],
+                    "true" if record["dnssec"] else "false",
+                    record["protocol"],
+                    record["clientIp"],
+                    record["status"],
+                    ",".join(reason["id"] for reason in record["reasons"]),
+                    "",
+                    record["root"],
+                    device["id"],
+                    device["name"],
+                    device["model"],
+                    "",
+                    "",
+                    "",
+                )
+            )
+
+        return web.Response(text=output.getvalue(), content_type="text/csv")
+
+    async def _stream_logs(self, request: web.Request) -> web.StreamResponse:
+        """Send the new logs as server-sent events, resuming after the ID."""
+        self._profile(request)
+        profile_id = request.match_info["profile_id"]
+        logs = self._logs[profile_id]
+        last_id = request.query.get("id")
+        position = len(logs) if last_id is None else int(last_id) + 1
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        while not self._closing:
+            logs = self._logs[profile_id]
+            logs_added = self._logs_added
+            for index in range(min(position, len(logs)), len(logs)):
+                data = json.dumps(logs[index][1])
+                await response.write(f"id: {index}\ndata: {data}\n\n".encode())
+            position = len(logs)
+            await logs_added.wait()
+
+        return response
+
+    async def _test(self, request: web.Request) -> web.Response:
+        """Return the connection status of the profile."""
+        if (profile := self._profiles.get(request.match_info["profile_id"])) is None:
+            return web.json_response({"status": "unconfigured"})
+
+        return web.json_response(
+            {"status": "ok", "protocol": "DOH", "profile": profile["fingerprint"]}
+        )
+
+    async def _body(self, request: web.Request) -> dict[str, Any]:
+        """Return the JSON object of the request body."""
+        try:
+            body = await request.json()
+        except ValueError as error:
+            raise web.HTTPBadRequest(
+                text=json.dumps({"errors": [{"code": "invalidJson"}]}),
+                content_type="application/json",
+            ) from error
+        if not isinstance(body, dict):
+            raise web.HTTPBadRequest(
+                text=json.dumps({"errors": [{"code": "invalidJson"}]}),
+                content_type="application/json",
+            )
+
+        return body
+
+    async def _patch(self, request: web.Request) -> web.Response:
+        """Update the object of the profile at the path."""
+        node = _resolve(self._profile(request), request.match_info["path"].split("/"))
+        if not isinstance(node, dict):
+            return _error(HTTPStatus.NOT_FOUND, "notFound", "Not found")
+
+        _merge(node, await self._body(request))
+
+        return web.Response(status=HTTPStatus.NO_CONTENT)
+
+    async def _post(self, request: web.Request) -> web.Response:
+        """Add an item to the list of the profile at the path."""
+        node = _resolve(self._profile(request), request.match_info["path"].split("/"))
+        body = await self._body(request)
+        if not isinstance(node, list):
+            return _error(HTTPStatus.NOT_FOUND, "notFound", "Not found")
+        if "id" not in body:
+            return _error(HTTPStatus.BAD_REQUEST, "invalid", "Missing id")
+
+        node[:] = [item for item in node if item.get("id") != body["id"]]
+        node.append({"active": True, "recreation": False, **body})
+
+        return web.Response(status=HTTPStatus.NO_CONTENT)
+
+    async def _delete(self, request: web.Request) -> web.Response:
+        """Remove the item from the list of the profile at the path."""
+        *path, item_id = request.match_info["path"].split("/")
+        node = _resolve(self._profile(request), path)
+        if not isinstance(node, list) or _resolve(node, [item_id]) is None:
+            return _error(HTTPStatus.NOT_FOUND, "notFound", "Not found")
+
+        node[:] = [item for item in node if item.get("id") != item_id]
+
+        return web.Response(status=HTTPStatus.NO_CONTENT)
@@ -14,6 +14,21 @@ from syrupy.extensions.amber import AmberSnapshotExtension
 from syrupy.location import PyTestLocation
 
 
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the option checking the benchmark timings."""
+    parser.addoption(
+        "--benchmark",
+        action="store_true",
+        help="check the wall clock timings of the benchmarks",
+    )
+
+
+@pytest.fixture
+def check_timings(request: pytest.FixtureRequest) -> bool:
+    """Return True if the benchmark timings are checked."""
+    return request.config.getoption("--benchmark")
+
+
 @pytest_asyncio.fixture(loop_scope="function")
 async def session(session_mock: aiointercept) -> AsyncGenerator[aiohttp.ClientSession]:  # noqa: ARG001
     """Return a mock ClientSession."""
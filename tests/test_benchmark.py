@@ -0,0 +1,346 @@
+"""Benchmarks for nextdns package.
+
+Wall clock timings depend on the machine and its load, they are checked only
+when pytest runs with --benchmark.
+"""
+
+import asyncio
+import json
+import subprocess
+import sys
+import tracemalloc
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from dataclasses import fields, make_dataclass
+from pathlib import Path
+from statistics import quantiles
+from time import perf_counter, process_time
+from timeit import timeit
+from typing import Any
+
+import aiohttp
+import pytest
+import pytest_asyncio
+
+from nextdns import NextDns
+from nextdns.client import _decode_settings
+from nextdns.const import (
+    ATTR_BAV,
+    ATTR_BLOCK_PAGE,
+    ATTR_ENABLED,
+    ATTR_LOCATION,
+    ATTR_LOGS,
+    ATTR_PERFORMANCE,
+    ATTR_RETENTION,
+    ATTR_WEB3,
+    MAP_PROFILE,
+)
+from nextdns.model import (
+    AnalyticsProtocols,
+    AnalyticsStatus,
+    ApiNames,
+    NextDnsData,
+    ParentalControlCategories,
+    ParentalControlServices,
+    Profile,
+    ProfileInfo,
+    Settings,
+)
+from nextdns.testing import FakeNextDnsServer
+
+IMPORT_TIME_BUDGET = 0.1
+INSTANCES = 1000
+REPEAT = 5
+NUMBER = 2000
+
+CALLS = 96
+CONCURRENCY = (1, 8, 32)
+MIN_CALLS_PER_SECOND = 20
+PROFILE_ID = "fakepr"
+LOGS = 1000
+
+OPERATIONS: dict[str, Callable[[NextDns], Awaitable[object]]] = {
+    "get_all_analytics": lambda nextdns: nextdns.get_all_analytics(PROFILE_ID),
+    "get_logs": lambda nextdns: nextdns.get_logs(PROFILE_ID),
+    "get_settings": lambda nextdns: nextdns.get_settings(PROFILE_ID),
+    "set_setting": lambda nextdns: nextdns.set_setting(
+        PROFILE_ID, ATTR_BLOCK_PAGE, True
+    ),
+}
+
+
+def load_profile() -> Profile:
+    """Return profile data with some parental control services."""
+    with Path.open(Path("tests/fixtures/profile.json"), encoding="utf-8") as file:
+        data = json.load(file)["data"]
+    data["parentalControl"]["services"] = [
+        {"id": service, "active": index % 2 == 0}
+        for index, service in enumerate(ParentalControlServices)
+        if index % 3 == 0
+    ]
+    return Profile(**{MAP_PROFILE.get(key, key): value for key, value in data.items()})
+
+
+def best_times(
+    decoders: tuple[Callable[[Profile], Settings], ...], profile_data: Profile
+) -> list[float]:
+    """Return the best time of the benchmark runs for each decoder.
+
+    The runs of the decoders are interleaved, so a slowdown of the machine
+    affects all of them alike.
+    """
+    times = [float("inf")] * len(decoders)
+    for _ in range(REPEAT):
+        for index, decode in enumerate(decoders):
+            time = timeit(lambda decode=decode: decode(profile_data), number=NUMBER)
+            times[index] = min(times[index], time)
+
+    return times
+
+
+def bytes_per_instance(cls: type, values: list[Any]) -> float:
+    """Return memory allocated for one instance of the class."""
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        instances = [cls(*values) for _ in range(INSTANCES)]
+        size = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+
+    assert len(instances) == INSTANCES
+
+    return size / INSTANCES
+
+
+def legacy_decode_settings(profile_data: Profile) -> Settings:
+    """Decode settings with a keyword argument for every field."""
+    services = {
+        service["id"]: service["active"]
+        for service in profile_data.parental_control[ApiNames.SERVICES]
+    }
+
+    categories = {
+        category["id"]: category["active"]
+        for category in profile_data.parental_control[ApiNames.CATEGORIES]
+    }
+
+    return Settings(
+        bav=profile_data.settings[ATTR_BAV],
+        block_page=profile_data.settings["blockPage"][ATTR_ENABLED],
+        cache_boost=profile_data.settings[ATTR_PERFORMANCE][ApiNames.CACHE_BOOST],
+        cname_flattening=profile_data.settings[ATTR_PERFORMANCE][
+            ApiNames.CNAME_FLATTENING
+        ],
+        anonymized_ecs=profile_data.settings[ATTR_PERFORMANCE][ApiNames.ECS],
+        logs=profile_data.settings[ATTR_LOGS][ATTR_ENABLED],
+        logs_location=profile_data.settings[ATTR_LOGS][ATTR_LOCATION],
+        logs_retention=int(profile_data.settings[ATTR_LOGS][ATTR_RETENTION] / 3600),
+        web3=profile_data.settings[ATTR_WEB3],
+        allow_affiliate=profile_data.privacy[ApiNames.ALLOW_AFFILIATE],
+        block_disguised_trackers=profile_data.privacy[ApiNames.DISGUISED_TRACKERS],
+        ai_threat_detection=profile_data.security[ApiNames.AI_THREAT_DETECTION],
+        block_csam=profile_data.security[ApiNames.CSAM],
+        block_ddns=profile_data.security[ApiNames.DDNS],
+        block_nrd=profile_data.security[ApiNames.NRD],
+        block_parked_domains=profile_data.security[ApiNames.PARKING],
+        cryptojacking_protection=profile_data.security[ApiNames.CRYPTOJACKING],
+        dga_protection=profile_data.security[ApiNames.DGA],
+        dns_rebinding_protection=profile_data.security[ApiNames.DNS_REBINDING],
+        google_safe_browsing=profile_data.security[ApiNames.GOOGLE_SAFE_BROWSING],
+        idn_homograph_attacks_protection=profile_data.security[ApiNames.IDN_HOMOGRAPHS],
+        threat_intelligence_feeds=profile_data.security[
+            ApiNames.THREAT_INTELLIGENCE_FEEDS
+        ],
+        typosquatting_protection=profile_data.security[ApiNames.TYPOSQUATTING],
+        block_bypass_methods=profile_data.parental_control[ApiNames.BLOCK_BYPASS],
+        safesearch=profile_data.parental_control[ApiNames.SAFESEARCH],
+        youtube_restricted_mode=profile_data.parental_control[
+            ApiNames.YOUTUBE_RESTRICTED_MODE
+        ],
+        block_9gag=services.get(ParentalControlServices.NINEGAG, False),
+        block_amazon=services.get(ParentalControlServices.AMAZON, False),
+        block_bereal=services.get(ParentalControlServices.BEREAL, False),
+        block_blizzard=services.get(ParentalControlServices.BLIZZARD, False),
+        block_chatgpt=services.get(ParentalControlServices.CHATGPT, False),
+        block_dailymotion=services.get(ParentalControlServices.DAILYMOTION, False),
+        block_discord=services.get(ParentalControlServices.DISCORD, False),
+        block_disneyplus=services.get(ParentalControlServices.DISNEYPLUS, False),
+        block_ebay=services.get(ParentalControlServices.EBAY, False),
+        block_facebook=services.get(ParentalControlServices.FACEBOOK, False),
+        block_fortnite=services.get(ParentalControlServices.FORTNITE, False),
+        block_google_chat=services.get(ParentalControlServices.GOOGLE_CHAT, False),
+        block_hbomax=services.get(ParentalControlServices.HBOMAX, False),
+        block_hulu=services.get(ParentalControlServices.HULU, False),
+        block_imgur=services.get(ParentalControlServices.IMGUR, False),
+        block_instagram=services.get(ParentalControlServices.INSTAGRAM, False),
+        block_leagueoflegends=services.get(
+            ParentalControlServices.LEAGUEOFLEGENDS, False
+        ),
+        block_mastodon=services.get(ParentalControlServices.MASTODON, False),
+        block_messenger=services.get(ParentalControlServices.MESSENGER, False),
+        block_minecraft=services.get(ParentalControlServices.MINECRAFT, False),
+        block_netflix=services.get(ParentalControlServices.NETFLIX, False),
+        block_pinterest=services.get(ParentalControlServices.PINTEREST, False),
+        block_primevideo=services.get(ParentalControlServices.PRIMEVIDEO, False),
+        block_reddit=services.get(ParentalControlServices.REDDIT, False),
+        block_roblox=services.get(ParentalControlServices.ROBLOX, False),
+        block_signal=services.get(ParentalControlServices.SIGNAL, False),
+        block_skype=services.get(ParentalControlServices.SKYPE, False),
+        block_snapchat=services.get(ParentalControlServices.SNAPCHAT, False),
+        block_spotify=services.get(ParentalControlServices.SPOTIFY, False),
+        block_steam=services.get(ParentalControlServices.STEAM, False),
+        block_telegram=services.get(ParentalControlServices.TELEGRAM, False),
+        block_tiktok=services.get(ParentalControlServices.TIKTOK, False),
+        block_tinder=services.get(ParentalControlServices.TINDER, False),
+        block_tumblr=services.get(ParentalControlServices.TUMBLR, False),
+        block_twitch=services.get(ParentalControlServices.TWITCH, False),
+        block_twitter=services.get(ParentalControlServices.TWITTER, False),
+        block_vimeo=services.get(ParentalControlServices.VIMEO, False),
+        block_vk=services.get(ParentalControlServices.VK, False),
+        block_whatsapp=services.get(ParentalControlServices.WHATSAPP, False),
+        block_xboxlive=services.get(ParentalControlServices.XBOXLIVE, False),
+        block_youtube=services.get(ParentalControlServices.YOUTUBE, False),
+        block_zoom=services.get(ParentalControlServices.ZOOM, False),
+        block_dating=categories.get(ParentalControlCategories.DATING, False),
+        block_gambling=categories.get(ParentalControlCategories.GAMBLING, False),
+        block_piracy=categories.get(ParentalControlCategories.PIRACY, False),
+        block_playstation_network=services.get(
+            ParentalControlServices.PLAYSTATION_NETWORK, False
+        ),
+        block_porn=categories.get(ParentalControlCategories.PORN, False),
+        block_social_networks=categories.get(
+            ParentalControlCategories.SOCIAL_NETWORKS, False
+        ),
+        block_online_gaming=categories.get(
+            ParentalControlCategories.ONLINE_GAMING, False
+        ),
+        block_video_streaming=categories.get(
+            ParentalControlCategories.VIDEO_STREAMING, False
+        ),
+    )
+
+
+def test_decode_settings(check_timings: bool) -> None:
+    """Test that the settings decoder is faster than keyword arguments."""
+    profile_data = load_profile()
+
+    assert _decode_settings(profile_data) == legacy_decode_settings(profile_data)
+    if not check_timings:
+        return
+    table_time, legacy_time = best_times(
+        (_decode_settings, legacy_decode_settings), profile_data
+    )
+    assert table_time < legacy_time
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        AnalyticsProtocols(doh_queries=20, doq_queries=10, udp_queries=70),
+        AnalyticsStatus(allowed_queries=5, blocked_queries=10, default_queries=85),
+        ProfileInfo(id="xyz12", fingerprint="abcdef1234", name="Fake Profile"),
+        _decode_settings(load_profile()),
+    ],
+    ids=lambda data: type(data).__name__,
+)
+def test_model_memory(data: NextDnsData) -> None:
+    """Test that slotted models take less memory than ones with __dict__."""
+    cls = type(data)
+    names = [field.name for field in fields(cls)]
+    values = [getattr(data, name) for name in names]
+    # The same model without __slots__, as the models were defined before
+    namespace = (
+        {"__post_init__": vars(cls)["__post_init__"]}
+        if "__post_init__" in vars(cls)
+        else {}
+    )
+    legacy_cls = make_dataclass(cls.__name__, names, namespace=namespace)
+
+    assert not hasattr(data, "__dict__")
+    assert bytes_per_instance(cls, values) < bytes_per_instance(legacy_cls, values)
+
+
+def test_import_time(check_timings: bool) -> None:
+    """Test that importing the package is fast and doesn't import aiohttp."""
+    code = (
+        "import sys, time; start = time.perf_counter(); import nextdns; "
+        "print(time.perf_counter() - start, 'aiohttp' in sys.modules, "
+        "'tenacity' in sys.modules)"
+    )
+    runs = [
+        subprocess.run(  # noqa: S603
+            [sys.executable, "-c", code], capture_output=True, check=True, text=True
+        ).stdout.split()
+        for _ in range(REPEAT)
+    ]
+
+    assert runs[0][1:] == ["False", "False"]
+    if check_timings:
+        assert min(float(elapsed) for elapsed, _, _ in runs) < IMPORT_TIME_BUDGET
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def api_session() -> AsyncGenerator[aiohttp.ClientSession]:
+    """Return a ClientSession sending the API requests to a fake API server."""
+    async with FakeNextDnsServer(seed=1) as server:
+        server.add_profile(PROFILE_ID, "Fake Profile")
+        server.generate_logs(PROFILE_ID, LOGS)
+        async with server.session() as session:
+            yield session
+
+
+async def run_benchmark(
+    call: Callable[[], Awaitable[object]], concurrency: int
+) -> dict[str, float]:
+    """Make the calls from concurrent workers and return the statistics."""
+    latencies: list[float] = []
+
+    async def worker() -> None:
+        for _ in range(CALLS // concurrency):
+            start = perf_counter()
+            await call()
+            latencies.append(perf_counter() - start)
+
+    cpu_start = process_time()
+    start = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = perf_counter() - start
+    # The server runs in this process, its CPU time is included
+    cpu_time = process_time() - cpu_start
+
+    percentiles = quantiles(latencies, n=100)
+
+    return {
+        "calls_per_second": len(latencies) / elapsed,
+        "latency_p50": percentiles[49],
+        "latency_p95": percentiles[94],
+        "latency_p99": percentiles[98],
+        "cpu_time_per_call": cpu_time / len(latencies),
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("concurrency", CONCURRENCY)
+@pytest.mark.parametrize("operation", OPERATIONS)
+async def test_api_benchmark(
+    api_session: aiohttp.ClientSession,
+    record_property: Callable[[str, object], None],
+    check_timings: bool,
+    operation: str,
+    concurrency: int,
+) -> None:
+    """Benchmark API calls against the local server.
+
+    The statistics are recorded as properties of the test, run pytest with
+    --junitxml to save them.
+    """
+    nextdns = await NextDns.create(api_session, "fakeapikey")
+
+    results = await run_benchmark(lambda: OPERATIONS[operation](nextdns), concurrency)
+
+    for name, value in results.items():
+        record_property(name, value)
+
+    assert results["latency_p50"] <= results["latency_p95"] <= results["latency_p99"]
+    if check_timings:
+        assert results["calls_per_second"] > MIN_CALLS_PER_SECOND
@@ -0,0 +1,61 @@
+"""Tests for nextdns cache."""
+
+from unittest.mock import patch
+
+from nextdns.cache import TtlCache
+
+
+def test_ttl_expiry() -> None:
+    """Test that entries expire after the time to live."""
+    cache = TtlCache(10, 4)
+
+    with patch("nextdns.cache.monotonic", return_value=100):
+        cache.set("abc", 1)
+    with patch("nextdns.cache.monotonic", return_value=109):
+        assert cache.get("abc") == 1
+    with patch("nextdns.cache.monotonic", return_value=110):
+        assert cache.get("abc") is None
+
+    assert len(cache) == 0
+
+
+def test_lru_eviction() -> None:
+    """Test that the least recently used entry is evicted."""
+    cache = TtlCache(None, 2)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_pop_and_clear() -> None:
+    """Test removing entries."""
+    cache = TtlCache(None, 4)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.pop("a")
+    cache.pop("missing")
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_items() -> None:
+    """Test that items() returns only the entries that have not expired."""
+    cache = TtlCache(10, 4)
+
+    with patch("nextdns.cache.monotonic", return_value=100):
+        cache.set("a", 1)
+    with patch("nextdns.cache.monotonic", return_value=105):
+        cache.set("b", 2)
+        cache.set("c", 3, 20)
+    with patch("nextdns.cache.monotonic", return_value=110):
+        assert cache.items() == [("b", 2, 5), ("c", 3, 15)]
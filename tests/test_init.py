@@ -1,17 +1,22 @@
 """Tests for nextdns package."""
 
+import asyncio
 import json
 import re
+import subprocess
+import sys
+from collections.abc import AsyncIterator
 from http import HTTPStatus
 from pathlib import Path
 from typing import Any
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import aiohttp
 import pytest
 from aiointercept import aiointercept
 from syrupy import SnapshotAssertion
 from tenacity import RetryError
+from yarl import URL
 
 from nextdns import (
     ATTR_ANALYTICS,
@@ -22,21 +27,59 @@ from nextdns import (
     ATTR_PARENTAL_CONTROL_SERVICES,
     ATTR_PROFILE,
     ATTR_PROFILES,
+    ATTR_QUERY_LOGS,
+    ATTR_STREAM_LOGS,
     ATTR_TEST,
     ENDPOINTS,
     MAP_SETTING,
     ApiError,
+    ConcurrencyLimiter,
     InvalidApiKeyError,
+    LogEntry,
     NextDns,
     ProfileIdNotFoundError,
     ProfileNameNotFoundError,
+    RateLimiter,
+    RequestEvent,
+    RequestHooks,
+    RolloutResult,
     SettingNotSupportedError,
 )
-from nextdns.const import ATTR_BLOCK_PAGE
+from nextdns.const import (
+    API_ENDPOINT,
+    ATTR_BLOCK_PAGE,
+    ATTR_SECURITY,
+    CONNECTIONS_PER_HOST,
+    DOWNLOAD_TIMEOUT,
+)
 
 PROFILE_ID = "fakepr"
 
 
+class RecordingHooks(RequestHooks):
+    """Request hooks recording the events."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.events: list[tuple[str, RequestEvent]] = []
+
+    def on_request_start(self, event: RequestEvent) -> None:
+        """Record the event."""
+        self.events.append(("start", event))
+
+    def on_response(self, event: RequestEvent) -> None:
+        """Record the event."""
+        self.events.append(("response", event))
+
+    def on_retry(self, event: RequestEvent) -> None:
+        """Record the event."""
+        self.events.append(("retry", event))
+
+    def on_error(self, event: RequestEvent) -> None:
+        """Record the event."""
+        self.events.append(("error", event))
+
+
 @pytest.mark.asyncio
 async def test_valid_data(
     session: aiohttp.ClientSession,
@@ -459,3 +502,1263 @@ async def test_set_logs_location_with_invalid_value(
         ),
     ):
         await nextdns.set_logs_location(PROFILE_ID, "pl")
+
+
+@pytest.mark.asyncio
+async def test_iter_logs_raw(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test iter_logs_raw() method."""
+    with Path.open(Path("tests/fixtures/logs.csv"), "rb") as file:
+        logs = file.read()
+
+    async def chunks() -> AsyncIterator[bytes]:
+        for index in range(0, len(logs), 100):
+            yield logs[index : index + 100]
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.get(
+        ENDPOINTS[ATTR_GET_LOGS].format(profile_id=PROFILE_ID),
+        body=chunks(),
+        content_type="text/csv",
+    )
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+
+    result = [chunk async for chunk in nextdns.iter_logs_raw(PROFILE_ID, 64)]
+
+    assert len(result) > 1
+    assert max(len(chunk) for chunk in result) <= 64
+    assert b"".join(result) == logs
+
+
+@pytest.mark.asyncio
+async def test_download_logs_to(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+    tmp_path: Path,
+) -> None:
+    """Test download_logs_to() method."""
+    with Path.open(Path("tests/fixtures/logs.csv"), "rb") as file:
+        logs = file.read()
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.get(
+        ENDPOINTS[ATTR_GET_LOGS].format(profile_id=PROFILE_ID),
+        body=logs,
+        content_type="text/csv",
+    )
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+
+    path = tmp_path / "logs.csv"
+    with patch.object(nextdns, "_request", wraps=nextdns._request) as request_mock:  # noqa: SLF001
+        result = await nextdns.download_logs_to(PROFILE_ID, path)
+
+    assert result == len(logs)
+    assert path.read_bytes() == logs
+    assert request_mock.call_args.kwargs["client_timeout"] is DOWNLOAD_TIMEOUT
+
+
+@pytest.mark.asyncio
+async def test_iter_log_entries(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test iter_log_entries() method."""
+    with Path.open(Path("tests/fixtures/logs.csv"), "rb") as file:
+        logs = file.read()
+    logs += (
+        b"2022-11-14T18:15:05+00:00,example.com,AAAA,true,DNS-over-HTTPS,"
+        b'10.10.10.10,blocked,blocklist:oisd,,example.com,8M05S,"Client",,,,'
+        b'"Multi\nline, name"\n'
+    )
+
+    async def chunks() -> AsyncIterator[bytes]:
+        for index in range(0, len(logs), 7):
+            yield logs[index : index + 7]
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.get(
+        ENDPOINTS[ATTR_GET_LOGS].format(profile_id=PROFILE_ID),
+        body=chunks(),
+        content_type="text/csv",
+    )
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+
+    result = [entry async for entry in nextdns.iter_log_entries(PROFILE_ID)]
+
+    assert result == [
+        LogEntry(
+            timestamp=1668449704122893,
+            dnssec=False,
+            domain="sync-1-us-west1-g.sync.services.mozilla.com",
+            query_type="A",
+            protocol="DNS-over-TLS",
+            client_ip="10.10.10.10",
+            status="",
+            reasons="",
+            destination_country="US",
+            root_domain="mozilla.com",
+            device_id="8M05S",
+            device_name="Client",
+            device_model="",
+            device_local_ip="",
+            matched_name="",
+            client_name="",
+        ),
+        LogEntry(
+            timestamp=1668449704118270,
+            dnssec=False,
+            domain="profile.accounts.firefox.com",
+            query_type="A",
+            protocol="DNS-over-TLS",
+            client_ip="10.10.10.10",
+            status="",
+            reasons="",
+            destination_country="US",
+            root_domain="firefox.com",
+            device_id="8M05S",
+            device_name="Client",
+            device_model="",
+            device_local_ip="",
+            matched_name="",
+            client_name="",
+        ),
+        LogEntry(
+            timestamp=1668449705000000,
+            dnssec=True,
+            domain="example.com",
+            query_type="AAAA",
+            protocol="DNS-over-HTTPS",
+            client_ip="10.10.10.10",
+            status="blocked",
+            reasons="blocklist:oisd",
+            destination_country="",
+            root_domain="example.com",
+            device_id="8M05S",
+            device_name="Client",
+            device_model="",
+            device_local_ip="",
+            matched_name="",
+            client_name="Multi\nline, name",
+        ),
+    ]
+    assert result[0].device_name is result[1].device_name
+    assert not hasattr(result[0], "__dict__")
+
+
+@pytest.mark.asyncio
+async def test_iter_logs(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test iter_logs() method."""
+    record = {
+        "timestamp": "2022-11-14T18:15:04.122Z",
+        "domain": "example.com",
+        "root": "example.com",
+        "encrypted": True,
+        "protocol": "DNS-over-HTTPS",
+        "clientIp": "10.10.10.10",
+        "client": None,
+        "device": {"id": "8M05S", "name": "Client", "model": "iPhone"},
+        "status": "blocked",
+        "reasons": [{"id": "blocklist:oisd", "name": "OISD"}],
+    }
+    url = URL(ENDPOINTS[ATTR_QUERY_LOGS].format(profile_id=PROFILE_ID))
+    params = {"from": "-1d", "status": "blocked", "limit": "10"}
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.get(
+        url.with_query(params),
+        payload={"data": [record, record], "meta": {"pagination": {"cursor": "a"}}},
+    )
+    session_mock.get(
+        url.with_query({**params, "cursor": "a"}),
+        payload={"data": [record], "meta": {"pagination": {"cursor": None}}},
+    )
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+
+    result = [
+        entry
+        async for entry in nextdns.iter_logs(
+            PROFILE_ID, date_from="-1d", status="blocked", limit=10
+        )
+    ]
+
+    assert len(result) == 3
+    assert result[2] == LogEntry(
+        timestamp=1668449704122000,
+        dnssec=False,
+        domain="example.com",
+        query_type="",
+        protocol="DNS-over-HTTPS",
+        client_ip="10.10.10.10",
+        status="blocked",
+        reasons="blocklist:oisd",
+        destination_country="",
+        root_domain="example.com",
+        device_id="8M05S",
+        device_name="Client",
+        device_model="iPhone",
+        device_local_ip="",
+        matched_name="",
+        client_name="",
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("kwargs", "message"),
+    [
+        (
+            {"status": "unknown"},
+            (
+                "Invalid logs status value. "
+                "Allowed values are: ('allowed', 'blocked', 'default', 'error')"
+            ),
+        ),
+        (
+            {"limit": 5},
+            "Invalid logs limit value. Allowed values are from 10 to 1000",
+        ),
+    ],
+)
+async def test_iter_logs_with_invalid_value(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+    kwargs: dict[str, Any],
+    message: str,
+) -> None:
+    """Test iter_logs() method with invalid value."""
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+
+    with pytest.raises(ValueError, match=re.escape(message)):
+        await anext(nextdns.iter_logs(PROFILE_ID, **kwargs))
+
+
+@pytest.mark.asyncio
+async def test_stream_logs(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test stream_logs() method."""
+
+    def event(event_id: str, domain: str) -> bytes:
+        record = {"timestamp": "2022-11-14T18:15:04Z", "domain": domain}
+        return f"id: {event_id}\ndata: {json.dumps(record)}\n\n".encode()
+
+    async def first_connection() -> AsyncIterator[bytes]:
+        yield event("1", "first.com")
+        yield b": keep-alive\n\n"
+        yield event("2", "second.com")
+
+    async def second_connection() -> AsyncIterator[bytes]:
+        yield event("3", "third.com")
+
+    url = URL(ENDPOINTS[ATTR_STREAM_LOGS].format(profile_id=PROFILE_ID))
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.get(
+        url.with_query({"device": "8M05S"}),
+        body=first_connection(),
+        content_type="text/event-stream",
+    )
+    session_mock.get(
+        url.with_query({"device": "8M05S", "id": "2"}),
+        body=second_connection(),
+        content_type="text/event-stream",
+    )
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+
+    stream = nextdns.stream_logs(PROFILE_ID, device="8M05S", buffer_size=1)
+    with patch("asyncio.sleep") as sleep_mock:
+        result = [(await anext(stream)).domain for _ in range(3)]
+    await stream.aclose()
+
+    assert result == ["first.com", "second.com", "third.com"]
+    assert sleep_mock.call_count >= 1
+
+
+@pytest.mark.asyncio
+async def test_stream_logs_invalid_api_key(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test stream_logs() method with invalid API key."""
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.get(
+        ENDPOINTS[ATTR_STREAM_LOGS].format(profile_id=PROFILE_ID),
+        status=HTTPStatus.FORBIDDEN.value,
+    )
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+
+    with pytest.raises(InvalidApiKeyError):
+        await anext(nextdns.stream_logs(PROFILE_ID))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("data", "error"), [("[]", AttributeError), ('{"timestamp": 1}', TypeError)]
+)
+async def test_stream_logs_invalid_record(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+    data: str,
+    error: type[Exception],
+) -> None:
+    """Test that stream_logs() raises the error of an invalid record."""
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.get(
+        ENDPOINTS[ATTR_STREAM_LOGS].format(profile_id=PROFILE_ID),
+        body=f"data: {data}\n\n",
+        content_type="text/event-stream",
+    )
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+
+    with pytest.raises(error):
+        await asyncio.wait_for(anext(nextdns.stream_logs(PROFILE_ID)), 5)
+
+
+@pytest.mark.asyncio
+async def test_stream_logs_closed_session(
+    session_mock: aiointercept, profiles_data: dict[str, Any]
+) -> None:
+    """Test that stream_logs() raises the error of a closed session."""
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+
+    async with aiohttp.ClientSession() as session:
+        nextdns = await NextDns.create(session, "fakeapikey")
+
+    with pytest.raises(RuntimeError, match="Session is closed"):
+        await asyncio.wait_for(anext(nextdns.stream_logs(PROFILE_ID)), 5)
+
+
+@pytest.mark.asyncio
+async def test_profile_cache(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test that profiles are cached and invalidated by setters."""
+    with Path.open(Path("tests/fixtures/profile.json"), encoding="utf-8") as file:
+        profile_data = json.load(file)
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    profile_mock = session_mock.get(
+        ENDPOINTS[ATTR_PROFILE].format(profile_id=PROFILE_ID),
+        payload=profile_data,
+        repeat=True,
+    )
+    session_mock.patch(
+        ENDPOINTS[ATTR_BLOCK_PAGE].format(profile_id=PROFILE_ID),
+        status=HTTPStatus.NO_CONTENT.value,
+    )
+
+    nextdns = await NextDns.create(session, "fakeapikey", profile_cache_ttl=60)
+
+    first = await nextdns.get_settings(PROFILE_ID)
+    second = await nextdns.get_settings(PROFILE_ID)
+
+    assert first == second
+    assert profile_mock.call_count == 1
+
+    await nextdns.set_setting(PROFILE_ID, "block_page", True)
+    await nextdns.get_settings(PROFILE_ID)
+
+    assert profile_mock.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_profile_cache_changed_during_request(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test that a profile changed during its request is not cached."""
+    with Path.open(Path("tests/fixtures/profile.json"), encoding="utf-8") as file:
+        profile_data = json.load(file)
+    changed_data = json.loads(json.dumps(profile_data))
+    changed_data["data"]["settings"]["blockPage"]["enabled"] = True
+    url = ENDPOINTS[ATTR_PROFILE].format(profile_id=PROFILE_ID)
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.get(url, payload=profile_data)
+    session_mock.get(url, payload=changed_data)
+    session_mock.patch(
+        ENDPOINTS[ATTR_BLOCK_PAGE].format(profile_id=PROFILE_ID),
+        status=HTTPStatus.NO_CONTENT.value,
+    )
+
+    nextdns = await NextDns.create(session, "fakeapikey", profile_cache_ttl=60)
+    send = nextdns._send_http_request  # noqa: SLF001
+    received = asyncio.Event()
+    release = asyncio.Event()
+
+    async def send_delayed(method: str, url: str, data: Any = None) -> Any:
+        result = await send(method, url, data)
+        if method == "get":
+            received.set()
+            await release.wait()
+        return result
+
+    with patch.object(nextdns, "_send_http_request", side_effect=send_delayed):
+        reader = asyncio.create_task(nextdns.get_settings(PROFILE_ID))
+        await received.wait()
+        await nextdns.set_setting(PROFILE_ID, "block_page", True)
+        release.set()
+
+        assert (await reader).block_page is False
+
+    assert (await nextdns.get_settings(PROFILE_ID)).block_page is True
+
+
+@pytest.mark.asyncio
+async def test_read_after_write(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test that a GET after a change doesn't join a request started before it."""
+    with Path.open(Path("tests/fixtures/profile.json"), encoding="utf-8") as file:
+        profile_data = json.load(file)
+    changed_data = json.loads(json.dumps(profile_data))
+    changed_data["data"]["settings"]["blockPage"]["enabled"] = True
+    url = ENDPOINTS[ATTR_PROFILE].format(profile_id=PROFILE_ID)
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.get(url, payload=profile_data)
+    session_mock.get(url, payload=changed_data)
+    session_mock.patch(
+        ENDPOINTS[ATTR_BLOCK_PAGE].format(profile_id=PROFILE_ID),
+        status=HTTPStatus.NO_CONTENT.value,
+    )
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+    send = nextdns._send_http_request  # noqa: SLF001
+    received = asyncio.Event()
+    release = asyncio.Event()
+
+    async def send_delayed(method: str, url: str, data: Any = None) -> Any:
+        result = await send(method, url, data)
+        if method == "get" and not received.is_set():
+            received.set()
+            await release.wait()
+        return result
+
+    with patch.object(nextdns, "_send_http_request", side_effect=send_delayed):
+        reader = asyncio.create_task(nextdns.get_settings(PROFILE_ID))
+        await received.wait()
+        await nextdns.set_setting(PROFILE_ID, "block_page", True)
+
+        settings = await asyncio.wait_for(nextdns.get_settings(PROFILE_ID), 5)
+        assert settings.block_page is True
+
+        release.set()
+        assert (await reader).block_page is False
+
+
+@pytest.mark.asyncio
+async def test_profile_cache_invalidated_on_error(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test that a partially failed change invalidates the cached profile."""
+    with Path.open(Path("tests/fixtures/profile.json"), encoding="utf-8") as file:
+        profile_data = json.load(file)
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    profile_mock = session_mock.get(
+        ENDPOINTS[ATTR_PROFILE].format(profile_id=PROFILE_ID),
+        payload=profile_data,
+        repeat=True,
+    )
+    session_mock.patch(
+        ENDPOINTS[ATTR_SECURITY].format(profile_id=PROFILE_ID),
+        status=HTTPStatus.INTERNAL_SERVER_ERROR.value,
+        payload={"errors": [{"code": "internalError"}]},
+    )
+    logs_mock = session_mock.patch(
+        ENDPOINTS[ATTR_LOGS].format(profile_id=PROFILE_ID),
+        status=HTTPStatus.NO_CONTENT.value,
+    )
+    session_mock.patch(
+        ENDPOINTS[ATTR_BLOCK_PAGE].format(profile_id=PROFILE_ID),
+        status=HTTPStatus.INTERNAL_SERVER_ERROR.value,
+        payload={"errors": [{"code": "internalError"}]},
+    )
+
+    nextdns = await NextDns.create(session, "fakeapikey", profile_cache_ttl=60)
+    await nextdns.get_settings(PROFILE_ID)
+
+    with pytest.raises(ApiError):
+        await nextdns.set_settings(PROFILE_ID, {"block_csam": True, "logs": True})
+    await nextdns.get_settings(PROFILE_ID)
+
+    assert logs_mock.call_count == 1
+    assert profile_mock.call_count == 2
+
+    with pytest.raises(ApiError):
+        await nextdns.set_setting(PROFILE_ID, "block_page", True)
+    await nextdns.get_settings(PROFILE_ID)
+
+    assert profile_mock.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_coalesce_concurrent_get_requests(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test that concurrent GET requests for the same URL share one request."""
+    with Path.open(Path("tests/fixtures/status.json"), encoding="utf-8") as file:
+        status_data = json.load(file)
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    status_mock = session_mock.get(
+        ENDPOINTS[ATTR_ANALYTICS].format(profile_id=PROFILE_ID, type="status"),
+        payload=status_data,
+        repeat=True,
+    )
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+
+    result = await asyncio.gather(
+        *(nextdns.get_analytics_status(PROFILE_ID) for _ in range(10))
+    )
+
+    assert status_mock.call_count == 1
+    assert all(status == result[0] for status in result)
+
+    await nextdns.get_analytics_status(PROFILE_ID)
+
+    assert status_mock.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_retry_after(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test that requests wait for Retry-After with a rate limiter."""
+    session_mock.get(
+        ENDPOINTS[ATTR_PROFILES],
+        status=HTTPStatus.TOO_MANY_REQUESTS.value,
+        headers={"Retry-After": "3"},
+    )
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+
+    limiter = RateLimiter(10)
+    with patch.object(limiter, "pause") as pause_mock:
+        nextdns = await NextDns.create(session, "fakeapikey", rate_limiter=limiter)
+
+    assert pause_mock.call_args_list[0][0][0] == 3
+    assert nextdns.get_profile_id("Fake Profile") == PROFILE_ID
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_too_many_requests(
+    session: aiohttp.ClientSession, session_mock: aiointercept
+) -> None:
+    """Test too many requests when the limit of attempts is reached."""
+    session_mock.get(
+        ENDPOINTS[ATTR_PROFILES], status=HTTPStatus.TOO_MANY_REQUESTS.value, repeat=True
+    )
+
+    limiter = RateLimiter(10)
+    with (
+        patch.object(limiter, "pause") as pause_mock,
+        pytest.raises(ApiError, match=re.escape("Too many requests")),
+    ):
+        await NextDns.create(session, "fakeapikey", rate_limiter=limiter)
+
+    assert pause_mock.call_count == 4
+    assert pause_mock.call_args_list[0][0][0] == 5
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limiter_overloaded(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test that HTTP 524 cuts down the concurrency limit."""
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], status=524, payload="Timeout Error")
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+
+    limiter = ConcurrencyLimiter(initial_limit=4)
+    # Constant clock, so latency of the requests doesn't affect the limit
+    with (
+        patch("asyncio.sleep"),
+        patch("nextdns.limiter.monotonic", return_value=0.0),
+    ):
+        await NextDns.create(session, "fakeapikey", concurrency_limiter=limiter)
+
+    assert limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_set_settings(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test set_settings() method."""
+    security_url = ENDPOINTS[ATTR_SECURITY].format(profile_id=PROFILE_ID)
+    logs_url = ENDPOINTS[ATTR_LOGS].format(profile_id=PROFILE_ID)
+    tinder_url = MAP_SETTING["block_tinder"].url.format(
+        profile_id=PROFILE_ID, service=MAP_SETTING["block_tinder"].name
+    )
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.patch(security_url, status=HTTPStatus.NO_CONTENT.value)
+    session_mock.patch(logs_url, status=HTTPStatus.NO_CONTENT.value)
+    session_mock.patch(tinder_url, status=HTTPStatus.NO_CONTENT.value)
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+
+    result = await nextdns.set_settings(
+        PROFILE_ID,
+        {
+            "block_csam": True,
+            "block_ddns": False,
+            "logs": True,
+            "logs_location": "ch",
+            "logs_retention": 24,
+            "block_tinder": True,
+        },
+    )
+
+    assert result is True
+    session_mock.assert_called_with(
+        security_url, "PATCH", json={"csam": True, "ddns": False}
+    )
+    session_mock.assert_called_with(
+        logs_url,
+        "PATCH",
+        json={"enabled": True, "location": "ch", "retention": 86400},
+    )
+    session_mock.assert_called_with(tinder_url, "PATCH", json={"active": True})
+
+
+@pytest.mark.asyncio
+async def test_set_settings_not_supported(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test set_settings() method with not supported setting."""
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+
+    with pytest.raises(SettingNotSupportedError):
+        await nextdns.set_settings(PROFILE_ID, {"block_csam": True, "unknown": True})
+
+
+@pytest.mark.asyncio
+async def test_rollout_settings(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test rollout_settings() method."""
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.patch(
+        ENDPOINTS[ATTR_SECURITY].format(profile_id=PROFILE_ID),
+        status=HTTPStatus.NO_CONTENT.value,
+    )
+    session_mock.patch(
+        ENDPOINTS[ATTR_SECURITY].format(profile_id="other"),
+        status=HTTPStatus.NOT_FOUND.value,
+        payload={"errors": [{"code": "notFound"}]},
+    )
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+
+    progress: list[tuple[str, int, int]] = []
+    result = await nextdns.rollout_settings(
+        {"block_csam": True},
+        [PROFILE_ID, "other"],
+        max_concurrency=1,
+        progress_callback=lambda result, done, total: progress.append(
+            (result.profile_id, done, total)
+        ),
+    )
+
+    assert result[0] == RolloutResult(PROFILE_ID, success=True)
+    assert result[1].profile_id == "other"
+    assert result[1].success is False
+    assert isinstance(result[1].error, ApiError)
+    assert progress == [(PROFILE_ID, 1, 2), ("other", 2, 2)]
+
+
+@pytest.mark.asyncio
+async def test_rollout_settings_all_profiles(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test rollout_settings() method for all profiles."""
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.patch(
+        ENDPOINTS[ATTR_LOGS].format(profile_id=PROFILE_ID),
+        status=HTTPStatus.NO_CONTENT.value,
+    )
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+
+    result = await nextdns.rollout_settings({"logs": True, "logs_retention": 1})
+
+    assert result == [RolloutResult(PROFILE_ID, success=True)]
+
+
+@pytest.mark.asyncio
+async def test_conditional_requests(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test that conditional requests reuse data on HTTP 304."""
+    with Path.open(Path("tests/fixtures/status.json"), encoding="utf-8") as file:
+        status_data = json.load(file)
+    url = ENDPOINTS[ATTR_ANALYTICS].format(profile_id=PROFILE_ID, type="status")
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.get(url, payload=status_data, headers={"ETag": '"v1"'})
+    session_mock.get(url, status=HTTPStatus.NOT_MODIFIED.value)
+
+    nextdns = await NextDns.create(session, "fakeapikey", conditional_requests=True)
+
+    first = await nextdns.get_analytics_status(PROFILE_ID)
+    second = await nextdns.get_analytics_status(PROFILE_ID)
+
+    assert first == second
+    assert first.all_queries == 1380300
+    session_mock.assert_called_with(url, headers={"If-None-Match": '"v1"'})
+
+
+@pytest.mark.asyncio
+async def test_conditional_requests_skip_logs_download(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test that the logs download is not kept in the validator cache."""
+    url = ENDPOINTS[ATTR_GET_LOGS].format(profile_id=PROFILE_ID)
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.get(
+        url, body="timestamp,domain\n", content_type="text/csv", headers={"ETag": "v1"}
+    )
+    session_mock.get(url, body="timestamp,domain\n", content_type="text/csv")
+
+    nextdns = await NextDns.create(session, "fakeapikey", conditional_requests=True)
+
+    assert await nextdns.get_logs(PROFILE_ID) == "timestamp,domain\n"
+    assert await nextdns.get_logs(PROFILE_ID) == "timestamp,domain\n"
+    assert session_mock.last_request is not None
+    assert aiohttp.hdrs.IF_NONE_MATCH not in session_mock.last_request.headers
+
+
+@pytest.mark.asyncio
+async def test_get_analytics_series(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test get_analytics_series() function."""
+    with Path.open(Path("tests/fixtures/status_series.json"), encoding="utf-8") as file:
+        series_data = json.load(file)
+    url = URL(
+        ENDPOINTS[ATTR_ANALYTICS].format(profile_id=PROFILE_ID, type="status;series")
+    ).with_query({"from": "-3h", "interval": 3600})
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.get(url, payload=series_data)
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+
+    series = await nextdns.get_analytics_series(
+        PROFILE_ID, "status", date_from="-3h", interval=3600
+    )
+
+    assert len(series) == 3
+    assert series.interval == 3600
+    assert series.times.tolist() == [1767225600, 1767229200, 1767232800]
+    assert series.queries["default_queries"].tolist() == [120, 98, 143]
+    assert series.queries["blocked_queries"].tolist() == [14, 9, 21]
+    assert series.queries["allowed_queries"].tolist() == [3, 0, 1]
+    assert series.queries["relayed_queries"].tolist() == [0, 0, 0]
+
+
+@pytest.mark.asyncio
+async def test_get_analytics_series_with_invalid_type(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test get_analytics_series() function with invalid analytics type."""
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+
+    with pytest.raises(ValueError, match="Invalid analytics type value"):
+        await nextdns.get_analytics_series(PROFILE_ID, "domains")
+
+
+@pytest.mark.asyncio
+async def test_custom_json_functions(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test that custom JSON functions are used for responses and bodies."""
+    json_loads = Mock(side_effect=json.loads)
+    json_dumps = Mock(side_effect=json.dumps)
+    url = MAP_SETTING[ATTR_BLOCK_PAGE].url.format(profile_id=PROFILE_ID)
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.patch(url, status=HTTPStatus.NO_CONTENT.value)
+
+    nextdns = await NextDns.create(
+        session, "fakeapikey", json_loads=json_loads, json_dumps=json_dumps
+    )
+
+    result = await nextdns.set_setting(PROFILE_ID, ATTR_BLOCK_PAGE, True)
+
+    assert result is True
+    assert nextdns.profiles[0].id == PROFILE_ID
+    json_loads.assert_called_once()
+    json_dumps.assert_called_once_with({"enabled": True})
+    session_mock.assert_called_with(url, "PATCH", data='{"enabled": true}')
+
+
+@pytest.mark.asyncio
+async def test_refresh_profiles(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test that refresh_profiles() rebuilds the profile lookups."""
+    new_profile = {"id": "newpr", "fingerprint": "newprofile34", "name": "New Profile"}
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.get(
+        ENDPOINTS[ATTR_PROFILES],
+        payload={"data": [*profiles_data["data"], new_profile]},
+    )
+    session_mock.get(
+        ENDPOINTS[ATTR_TEST].format(profile_id="newpr"),
+        payload={"status": "ok", "profile": "newprofile34"},
+    )
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+
+    with pytest.raises(ProfileNameNotFoundError):
+        nextdns.get_profile_id("New Profile")
+
+    await nextdns.refresh_profiles()
+    connection_status = await nextdns.connection_status("newpr")
+
+    assert len(nextdns.profiles) == 2
+    assert nextdns.get_profile_id("New Profile") == "newpr"
+    assert nextdns.get_profile_name("newpr") == "New Profile"
+    assert nextdns.get_profile_name(PROFILE_ID) == "Fake Profile"
+    assert connection_status.profile_id == "newpr"
+
+
+@pytest.mark.asyncio
+async def test_request_hooks(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test that request hooks get the events of requests."""
+    with Path.open(Path("tests/fixtures/status.json"), encoding="utf-8") as file:
+        status_data = json.load(file)
+    url = ENDPOINTS[ATTR_ANALYTICS].format(profile_id=PROFILE_ID, type="status")
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.get(url, payload=status_data, repeat=True)
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+    hooks = RecordingHooks()
+    remove_hooks = nextdns.add_request_hooks(hooks)
+
+    await nextdns.get_analytics_status(PROFILE_ID)
+    remove_hooks()
+    await nextdns.get_analytics_status(PROFILE_ID)
+
+    assert [name for name, _ in hooks.events] == ["start", "response"]
+    event = hooks.events[0][1]
+    assert event.method == "get"
+    assert event.url_template == ENDPOINTS[ATTR_ANALYTICS]
+    assert event.url_params == {"profile_id": PROFILE_ID, "type": "status"}
+    assert event.attempt == 1
+    assert event.status == HTTPStatus.OK
+    assert event.bytes_received == len(json.dumps(status_data))
+    assert event.elapsed is not None
+    assert event.error is None
+
+
+@pytest.mark.asyncio
+async def test_request_hooks_retry(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test that request hooks get the events of failed and retried requests."""
+    with Path.open(Path("tests/fixtures/status.json"), encoding="utf-8") as file:
+        status_data = json.load(file)
+    url = ENDPOINTS[ATTR_ANALYTICS].format(profile_id=PROFILE_ID, type="status")
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.get(url, status=524, payload="Timeout Error")
+    session_mock.get(url, payload=status_data)
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+    hooks = RecordingHooks()
+    nextdns.add_request_hooks(hooks)
+
+    with patch("asyncio.sleep"):
+        await nextdns.get_analytics_status(PROFILE_ID)
+
+    assert [name for name, _ in hooks.events] == [
+        "start",
+        "response",
+        "error",
+        "retry",
+        "start",
+        "response",
+    ]
+    failed = hooks.events[2][1]
+    assert failed is hooks.events[3][1]
+    assert failed.status == 524
+    assert isinstance(failed.error, TimeoutError)
+    assert hooks.events[5][1].status == HTTPStatus.OK
+
+
+@pytest.mark.asyncio
+async def test_request_hooks_invalid_api_key(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test that request hooks get the error of the request."""
+    url = ENDPOINTS[ATTR_ANALYTICS].format(profile_id=PROFILE_ID, type="status")
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.get(url, status=HTTPStatus.FORBIDDEN.value)
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+    hooks = RecordingHooks()
+    nextdns.add_request_hooks(hooks)
+
+    with pytest.raises(InvalidApiKeyError):
+        await nextdns.get_analytics_status(PROFILE_ID)
+
+    assert [name for name, _ in hooks.events] == ["start", "response", "error"]
+    assert isinstance(hooks.events[2][1].error, InvalidApiKeyError)
+
+
+@pytest.mark.asyncio
+async def test_request_hooks_added_during_request(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test that hooks added during a request are called for the next one."""
+    url = ENDPOINTS[ATTR_ANALYTICS].format(profile_id=PROFILE_ID, type="status")
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.get(url, status=HTTPStatus.FORBIDDEN.value)
+    session_mock.get(url, status=HTTPStatus.FORBIDDEN.value)
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+    hooks = RecordingHooks()
+    send = nextdns._send  # noqa: SLF001
+
+    async def send_adding_hooks(*args: Any) -> aiohttp.ClientResponse:
+        nextdns.add_request_hooks(hooks)
+        return await send(*args)
+
+    with (
+        patch.object(nextdns, "_send", side_effect=send_adding_hooks),
+        pytest.raises(InvalidApiKeyError),
+    ):
+        await nextdns.get_analytics_status(PROFILE_ID)
+
+    assert hooks.events == []
+
+    with pytest.raises(InvalidApiKeyError):
+        await nextdns.get_analytics_status(PROFILE_ID)
+
+    assert [name for name, _ in hooks.events] == ["start", "response", "error"]
+
+
+@pytest.mark.asyncio
+async def test_owned_session(
+    session_mock: aiointercept, profiles_data: dict[str, Any]
+) -> None:
+    """Test that the client creates its session and closes it."""
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+
+    async with await NextDns.create(None, "fakeapikey") as nextdns:
+        session = nextdns._session  # noqa: SLF001
+        assert nextdns.get_profile_id("Fake Profile") == PROFILE_ID
+        assert isinstance(session.connector, aiohttp.TCPConnector)
+        assert session.connector.limit_per_host == CONNECTIONS_PER_HOST
+
+    assert session.closed
+
+
+@pytest.mark.asyncio
+async def test_owned_session_closed_on_error(session_mock: aiointercept) -> None:
+    """Test that the session is closed when the client can't be created."""
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], status=HTTPStatus.FORBIDDEN.value)
+    sessions: list[aiohttp.ClientSession] = []
+
+    def create_session() -> aiohttp.ClientSession:
+        sessions.append(aiohttp.ClientSession())
+        return sessions[-1]
+
+    with (
+        patch("nextdns.client._create_session", create_session),
+        pytest.raises(InvalidApiKeyError),
+    ):
+        await NextDns.create(None, "fakeapikey")
+
+    assert len(sessions) == 1
+    assert sessions[0].closed
+
+
+def test_owned_session_created_on_first_use() -> None:
+    """Test that the client is created outside the event loop without a session."""
+    sessions: list[aiohttp.ClientSession] = []
+
+    nextdns = NextDns(None, "fakeapikey")
+    with patch("nextdns.client._create_session", side_effect=sessions.append):
+        asyncio.run(nextdns.close())
+
+    assert sessions == []
+
+
+@pytest.mark.asyncio
+async def test_supplied_session_not_closed(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test that the session of the caller is left open."""
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+
+    async with await NextDns.create(session, "fakeapikey"):
+        pass
+
+    assert not session.closed
+
+
+@pytest.mark.asyncio
+async def test_warm_up(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test that warm_up() sends requests opening the connections."""
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.head(API_ENDPOINT, status=HTTPStatus.NOT_FOUND.value, repeat=True)
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+    await nextdns.warm_up(3)
+
+    assert session_mock.call_count == 4
+
+
+@pytest.mark.asyncio
+async def test_snapshot(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+    tmp_path: Path,
+) -> None:
+    """Test that the client starts from the snapshot and refreshes it."""
+    with Path.open(Path("tests/fixtures/profile.json"), encoding="utf-8") as file:
+        profile_data = json.load(file)
+    new_profile = {"id": "newpr", "fingerprint": "newprofile34", "name": "New Profile"}
+    snapshot_path = tmp_path / "nextdns" / "snapshot.json"
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    profile_mock = session_mock.get(
+        ENDPOINTS[ATTR_PROFILE].format(profile_id=PROFILE_ID), payload=profile_data
+    )
+
+    async with await NextDns.create(
+        session, "fakeapikey", profile_cache_ttl=60, snapshot_path=snapshot_path
+    ) as nextdns:
+        profile = await nextdns.get_profile(PROFILE_ID)
+
+    snapshot_data = json.loads(snapshot_path.read_text(encoding="utf-8"))
+    assert snapshot_data["profiles"] == profiles_data["data"]
+    assert list(snapshot_data["profile_data"]) == [PROFILE_ID]
+    assert list(snapshot_path.parent.iterdir()) == [snapshot_path]
+
+    profiles_mock = session_mock.get(
+        ENDPOINTS[ATTR_PROFILES],
+        payload={"data": [*profiles_data["data"], new_profile]},
+    )
+
+    nextdns = await NextDns.create(
+        session, "fakeapikey", profile_cache_ttl=60, snapshot_path=snapshot_path
+    )
+
+    assert profiles_mock.call_count == 0
+    assert nextdns.get_profile_id("Fake Profile") == PROFILE_ID
+    assert await nextdns.get_profile(PROFILE_ID) == profile
+    assert profile_mock.call_count == 1
+
+    assert nextdns._revalidation is not None  # noqa: SLF001
+    await nextdns._revalidation  # noqa: SLF001
+
+    assert profiles_mock.call_count == 1
+    assert nextdns.get_profile_id("New Profile") == "newpr"
+    snapshot_data = json.loads(snapshot_path.read_text(encoding="utf-8"))
+    assert snapshot_data["profiles"] == [*profiles_data["data"], new_profile]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_expired_profile_data(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+    tmp_path: Path,
+) -> None:
+    """Test that profile documents from the snapshot keep their expiry."""
+    with Path.open(Path("tests/fixtures/profile.json"), encoding="utf-8") as file:
+        profile_data = json.load(file)
+    snapshot_path = tmp_path / "snapshot.json"
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data, repeat=True)
+    profile_mock = session_mock.get(
+        ENDPOINTS[ATTR_PROFILE].format(profile_id=PROFILE_ID),
+        payload=profile_data,
+        repeat=True,
+    )
+
+    with patch("nextdns.client.time", return_value=1000):
+        async with await NextDns.create(
+            session, "fakeapikey", profile_cache_ttl=60, snapshot_path=snapshot_path
+        ) as nextdns:
+            await nextdns.get_profile(PROFILE_ID)
+
+    snapshot_data = json.loads(snapshot_path.read_text(encoding="utf-8"))
+    assert snapshot_data["profile_data"][PROFILE_ID]["expires"] == pytest.approx(1060)
+
+    with patch("nextdns.client.time", return_value=1050):
+        nextdns = await NextDns.create(
+            session, "fakeapikey", profile_cache_ttl=60, snapshot_path=snapshot_path
+        )
+        assert nextdns._revalidation is not None  # noqa: SLF001
+        await nextdns._revalidation  # noqa: SLF001
+    await nextdns.get_profile(PROFILE_ID)
+
+    assert profile_mock.call_count == 1
+    assert nextdns._profile_cache is not None  # noqa: SLF001
+    assert nextdns._profile_cache.items()[0][2] <= 10  # noqa: SLF001
+
+    with patch("nextdns.client.time", return_value=1060):
+        nextdns = await NextDns.create(
+            session, "fakeapikey", profile_cache_ttl=60, snapshot_path=snapshot_path
+        )
+        assert nextdns._revalidation is not None  # noqa: SLF001
+        await nextdns._revalidation  # noqa: SLF001
+    await nextdns.get_profile(PROFILE_ID)
+
+    assert profile_mock.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_snapshot_revalidation_failed(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+    tmp_path: Path,
+) -> None:
+    """Test that profiles from the snapshot are kept when the API fails."""
+    snapshot_path = tmp_path / "snapshot.json"
+    snapshot_path.write_text(
+        json.dumps(
+            {"version": 2, "profiles": profiles_data["data"], "profile_data": {}}
+        ),
+        encoding="utf-8",
+    )
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], status=HTTPStatus.FORBIDDEN.value)
+
+    nextdns = await NextDns.create(session, "fakeapikey", snapshot_path=snapshot_path)
+    assert nextdns._revalidation is not None  # noqa: SLF001
+    await nextdns._revalidation  # noqa: SLF001
+
+    assert nextdns.get_profile_id("Fake Profile") == PROFILE_ID
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "content", ["{invalid", '{"version": 1, "profiles": []}', '{"version": 2}']
+)
+async def test_invalid_snapshot(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+    tmp_path: Path,
+    content: str,
+) -> None:
+    """Test that an invalid snapshot is replaced with data from the API."""
+    snapshot_path = tmp_path / "snapshot.json"
+    snapshot_path.write_text(content, encoding="utf-8")
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+
+    nextdns = await NextDns.create(session, "fakeapikey", snapshot_path=snapshot_path)
+
+    assert nextdns.get_profile_id("Fake Profile") == PROFILE_ID
+    snapshot_data = json.loads(snapshot_path.read_text(encoding="utf-8"))
+    assert snapshot_data["profiles"] == profiles_data["data"]
+
+
+def test_unknown_attribute() -> None:
+    """Test that an unknown name of the package doesn't import the modules."""
+    code = (
+        "import sys, nextdns\n"
+        "for name in ('asyncio', '_LOGGER', 'unknown'):\n"
+        "    try:\n"
+        "        getattr(nextdns, name)\n"
+        "    except AttributeError:\n"
+        "        print(name)\n"
+        "print('aiohttp' in sys.modules, 'nextdns.client' in sys.modules)"
+    )
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+
+    assert result.stdout.split() == ["asyncio", "_LOGGER", "unknown", "False", "False"]
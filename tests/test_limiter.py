@@ -0,0 +1,152 @@
+"""Tests for nextdns limiters."""
+
+import asyncio
+from collections.abc import Iterator
+from itertools import pairwise
+from time import monotonic
+from unittest.mock import patch
+
+import pytest
+
+from nextdns import ConcurrencyLimiter, RateLimiter
+
+
+class FakeClock:
+    """Clock advanced by sleeping."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        """Return current time."""
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        """Advance current time."""
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+@pytest.fixture
+def clock() -> Iterator[FakeClock]:
+    """Patch time functions with a fake clock."""
+    fake_clock = FakeClock()
+    with (
+        patch("nextdns.limiter.monotonic", fake_clock.monotonic),
+        patch("asyncio.sleep", fake_clock.sleep),
+    ):
+        yield fake_clock
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_burst(clock: FakeClock) -> None:
+    """Test that requests over the burst are paced by the rate."""
+    limiter = RateLimiter(2, burst=3)
+
+    for _ in range(5):
+        await limiter.acquire()
+
+    assert clock.sleeps == [0.5, 0.5]
+    assert clock.now == 1.0
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_pause(clock: FakeClock) -> None:
+    """Test that pause holds back requests."""
+    limiter = RateLimiter(10)
+
+    await limiter.acquire()
+    limiter.pause(30)
+    await limiter.acquire()
+    await limiter.acquire()
+
+    assert clock.now == 30.1
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_pause_queued_requests() -> None:
+    """Test that requests queued before a pause are paced after it."""
+    limiter = RateLimiter(20)
+    sent: list[float] = []
+
+    async def request() -> None:
+        await limiter.acquire()
+        sent.append(monotonic())
+
+    tasks = [asyncio.create_task(request()) for _ in range(5)]
+    await asyncio.sleep(0)
+    paused = monotonic()
+    limiter.pause(0.2)
+    await asyncio.gather(*tasks)
+
+    assert len(sent) == 5
+    assert sent[0] < paused
+    assert sent[1] - paused > 0.19
+    assert all(later - earlier > 0.04 for earlier, later in pairwise(sent[1:]))
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limiter_increase() -> None:
+    """Test that the limit grows with stable latency."""
+    limiter = ConcurrencyLimiter(initial_limit=2, max_limit=3)
+
+    for _ in range(3):
+        limiter.release(await limiter.acquire() - 0.1)
+
+    assert limiter.limit == 3
+
+    for _ in range(10):
+        limiter.release(await limiter.acquire() - 0.1)
+
+    assert limiter.limit == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limiter_decrease() -> None:
+    """Test that the limit is cut down once per round trip when overloaded."""
+    limiter = ConcurrencyLimiter(initial_limit=8)
+
+    first = await limiter.acquire()
+    second = await limiter.acquire()
+    limiter.release(first, overloaded=True)
+    limiter.release(second, overloaded=True)
+
+    assert limiter.limit == 4
+
+    limiter.release(await limiter.acquire(), overloaded=True)
+
+    assert limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limiter_rising_latency() -> None:
+    """Test that the limit is cut down when latency rises."""
+    limiter = ConcurrencyLimiter(initial_limit=8)
+
+    with patch("nextdns.limiter.monotonic", return_value=1.0):
+        await limiter.acquire()
+        limiter.release(0.9)
+    with patch("nextdns.limiter.monotonic", return_value=2.0):
+        await limiter.acquire()
+        limiter.release(1.0)
+
+    assert limiter.limit == 4
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limiter_waits_for_slot() -> None:
+    """Test that acquire waits while the limit is reached."""
+    limiter = ConcurrencyLimiter(initial_limit=1)
+
+    started = await limiter.acquire()
+    waiter = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+
+    assert not waiter.done()
+
+    limiter.release(started)
+    await waiter
+
+    assert waiter.done()
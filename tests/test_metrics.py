@@ -0,0 +1,159 @@
+"""Tests for nextdns client metrics."""
+
+import json
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import aiohttp
+import pytest
+from aiointercept import aiointercept
+
+from nextdns import (
+    ATTR_ANALYTICS,
+    ATTR_PROFILE,
+    ATTR_PROFILES,
+    ENDPOINTS,
+    ClientMetrics,
+    NextDns,
+    RequestEvent,
+)
+from nextdns.const import ATTR_BLOCK_PAGE
+
+PROFILE_ID = "fakepr"
+
+
+def request_event(status: int | None, elapsed: float | None) -> RequestEvent:
+    """Return a request event for the analytics endpoint."""
+    return RequestEvent(
+        "get",
+        f"https://api.nextdns.io/profiles/{PROFILE_ID}/analytics/status",
+        ENDPOINTS[ATTR_ANALYTICS],
+        {"profile_id": PROFILE_ID, "type": "status"},
+        1,
+        0.0,
+        bytes_sent=10,
+        elapsed=elapsed,
+        status=status,
+        bytes_received=100,
+    )
+
+
+def test_render() -> None:
+    """Test rendering of the request metrics."""
+    metrics = ClientMetrics(buckets=(0.1, 1))
+
+    for status, elapsed in ((200, 0.05), (429, 0.5), (524, 5)):
+        event = request_event(status, elapsed)
+        metrics.on_request_start(event)
+        metrics.on_response(event)
+    metrics.on_error(event)
+    metrics.on_retry(event)
+
+    labels = 'endpoint="https://api.nextdns.io/profiles/{profile_id}/analytics/{type}"'
+    labels += ',method="get"'
+    lines = metrics.render().splitlines()
+
+    assert "# TYPE nextdns_request_duration_seconds histogram" in lines
+    assert f'nextdns_request_duration_seconds_bucket{{{labels},le="0.1"}} 1' in lines
+    assert f'nextdns_request_duration_seconds_bucket{{{labels},le="1.0"}} 2' in lines
+    assert f'nextdns_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in lines
+    assert f"nextdns_request_duration_seconds_sum{{{labels}}} 5.55" in lines
+    assert f"nextdns_request_duration_seconds_count{{{labels}}} 3" in lines
+    assert f"nextdns_requests_total{{{labels}}} 3" in lines
+    assert f"nextdns_retries_total{{{labels}}} 1" in lines
+    assert f"nextdns_errors_total{{{labels}}} 1" in lines
+    assert f"nextdns_too_many_requests_total{{{labels}}} 1" in lines
+    assert f"nextdns_timeouts_total{{{labels}}} 1" in lines
+    assert f"nextdns_server_errors_total{{{labels}}} 1" in lines
+    assert f"nextdns_sent_bytes_total{{{labels}}} 30" in lines
+    assert f"nextdns_received_bytes_total{{{labels}}} 300" in lines
+
+
+def test_render_empty() -> None:
+    """Test rendering without requests."""
+    lines = ClientMetrics().render().splitlines()
+
+    assert all(line.startswith("#") for line in lines)
+
+
+def test_cache_hit_ratio() -> None:
+    """Test the cache hit ratio and rendering of cache metrics."""
+    metrics = ClientMetrics()
+
+    assert metrics.cache_hit_ratio("profile") is None
+
+    metrics.record_cache("profile", hit=False)
+    for _ in range(3):
+        metrics.record_cache("profile", hit=True)
+
+    assert metrics.cache_hit_ratio("profile") == 0.75
+    lines = metrics.render().splitlines()
+    assert 'nextdns_cache_hits_total{cache="profile"} 3' in lines
+    assert 'nextdns_cache_misses_total{cache="profile"} 1' in lines
+
+
+@pytest.mark.asyncio
+async def test_client_metrics(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test that the client updates the metrics."""
+    with Path.open(Path("tests/fixtures/profile.json"), encoding="utf-8") as file:
+        profile_data = json.load(file)
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.get(
+        ENDPOINTS[ATTR_PROFILE].format(profile_id=PROFILE_ID), payload=profile_data
+    )
+
+    metrics = ClientMetrics()
+    nextdns = await NextDns.create(
+        session, "fakeapikey", profile_cache_ttl=60, metrics=metrics
+    )
+
+    await nextdns.get_profile(PROFILE_ID)
+    await nextdns.get_profile(PROFILE_ID)
+
+    lines = metrics.render().splitlines()
+    for endpoint in (ENDPOINTS[ATTR_PROFILES], ENDPOINTS[ATTR_PROFILE]):
+        labels = f'endpoint="{endpoint}",method="get"'
+        assert f"nextdns_requests_total{{{labels}}} 1" in lines
+    assert metrics.cache_hit_ratio("profile") == 0.5
+
+
+@pytest.mark.asyncio
+async def test_client_metrics_without_events(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test that the client updates its metrics without request events."""
+    block_page_url = ENDPOINTS[ATTR_BLOCK_PAGE].format(profile_id=PROFILE_ID)
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], status=524, payload="Timeout Error")
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    session_mock.patch(block_page_url, status=204)
+
+    metrics = ClientMetrics()
+    with (
+        patch("nextdns.client.RequestEvent", wraps=RequestEvent) as event_mock,
+        patch("asyncio.sleep"),
+    ):
+        nextdns = await NextDns.create(session, "fakeapikey", metrics=metrics)
+        assert event_mock.call_count == 1
+
+        await nextdns.set_setting(PROFILE_ID, "block_page", True)
+        assert event_mock.call_count == 1
+
+    lines = metrics.render().splitlines()
+    labels = f'endpoint="{ENDPOINTS[ATTR_PROFILES]}",method="get"'
+    assert f"nextdns_requests_total{{{labels}}} 2" in lines
+    assert f"nextdns_retries_total{{{labels}}} 1" in lines
+    assert f"nextdns_errors_total{{{labels}}} 1" in lines
+    assert f"nextdns_timeouts_total{{{labels}}} 1" in lines
+    labels = f'endpoint="{ENDPOINTS[ATTR_BLOCK_PAGE]}",method="patch"'
+    assert f"nextdns_requests_total{{{labels}}} 1" in lines
+    assert f"nextdns_sent_bytes_total{{{labels}}} 17" in lines
+    session_mock.assert_called_with(block_page_url, "PATCH", json={"enabled": True})
@@ -0,0 +1,49 @@
+"""Tests for nextdns models."""
+
+from typing import Any
+
+from nextdns import PackedSettings, Settings
+from nextdns.const import ATTR_BLOCK_PAGE, MAP_SETTING
+from nextdns.model import ParentalControlServicesAttrs
+
+SETTINGS: dict[str, Any] = {
+    **dict.fromkeys(MAP_SETTING, False),
+    "bav": True,
+    "logs": True,
+    "logs_location": "eu",
+    "logs_retention": 24,
+    "block_porn": True,
+}
+
+
+def test_packed_settings() -> None:
+    """Test packing and unpacking settings."""
+    settings = Settings(**SETTINGS)
+
+    packed = PackedSettings.from_settings(settings)
+
+    assert packed.to_settings() == settings
+    assert packed == PackedSettings.from_settings(Settings(**SETTINGS))
+    assert hash(packed) == hash(PackedSettings.from_settings(Settings(**SETTINGS)))
+    assert packed.diff(packed) == []
+
+
+def test_packed_settings_diff() -> None:
+    """Test diff of packed settings."""
+    changes: dict[str, Any] = {
+        "bav": False,
+        ATTR_BLOCK_PAGE: True,
+        ParentalControlServicesAttrs.BLOCK_ZOOM: True,
+        "logs_retention": 720,
+    }
+    old = PackedSettings.from_settings(Settings(**SETTINGS))
+    new = PackedSettings.from_settings(Settings(**SETTINGS | changes))
+
+    assert new != old
+    assert new.diff(old) == [
+        "logs_retention",
+        "bav",
+        "block_page",
+        "block_zoom",
+    ]
+    assert len({old, new}) == 2
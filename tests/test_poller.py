@@ -0,0 +1,87 @@
+"""Tests for nextdns analytics poller."""
+
+import json
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+import pytest
+from aiointercept import aiointercept
+from yarl import URL
+
+from nextdns import ATTR_ANALYTICS, ATTR_PROFILES, ENDPOINTS, AnalyticsPoller, NextDns
+
+PROFILE_ID = "fakepr"
+
+FIXTURES = {
+    "dnssec": "dnssec.json",
+    "encryption": "encryption.json",
+    "ipVersions": "ip_versions.json",
+    "protocols": "protocols.json",
+    "status": "status.json",
+}
+
+
+def mock_analytics(session_mock: aiointercept, params: dict[str, str]) -> None:
+    """Mock all analytics endpoints for the date range."""
+    for analytics_type, fixture in FIXTURES.items():
+        with Path.open(Path("tests/fixtures", fixture), encoding="utf-8") as file:
+            data = json.load(file)
+        url = URL(
+            ENDPOINTS[ATTR_ANALYTICS].format(profile_id=PROFILE_ID, type=analytics_type)
+        ).with_query(params)
+        session_mock.get(url, payload=data)
+
+
+@pytest.mark.asyncio
+async def test_poll(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test that the poller fetches only the window since the last poll."""
+    first = datetime(2026, 1, 1, 12, 0, tzinfo=UTC)
+    second = datetime(2026, 1, 1, 12, 1, tzinfo=UTC)
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    mock_analytics(session_mock, {"to": first.isoformat()})
+    mock_analytics(session_mock, {"from": first.isoformat(), "to": second.isoformat()})
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+    poller = AnalyticsPoller(nextdns)
+
+    initial = await poller.poll(PROFILE_ID, first)
+    totals = await poller.poll(PROFILE_ID, second)
+
+    assert totals.status.all_queries == 2 * initial.status.all_queries
+    assert totals.status.blocked_queries == 2 * initial.status.blocked_queries
+    assert totals.status.blocked_queries_ratio == initial.status.blocked_queries_ratio
+    assert totals.protocols.doh_queries == 2 * initial.protocols.doh_queries
+    assert totals.dnssec.validated_queries_ratio == (
+        initial.dnssec.validated_queries_ratio
+    )
+
+
+@pytest.mark.asyncio
+async def test_poll_after_reset(
+    session: aiohttp.ClientSession,
+    session_mock: aiointercept,
+    profiles_data: dict[str, Any],
+) -> None:
+    """Test that the poller fetches the default window after reset."""
+    first = datetime(2026, 1, 1, 12, 0, tzinfo=UTC)
+    second = datetime(2026, 1, 1, 12, 1, tzinfo=UTC)
+
+    session_mock.get(ENDPOINTS[ATTR_PROFILES], payload=profiles_data)
+    mock_analytics(session_mock, {"to": first.isoformat()})
+    mock_analytics(session_mock, {"to": second.isoformat()})
+
+    nextdns = await NextDns.create(session, "fakeapikey")
+    poller = AnalyticsPoller(nextdns)
+
+    initial = await poller.poll(PROFILE_ID, first)
+    poller.reset(PROFILE_ID)
+    totals = await poller.poll(PROFILE_ID, second)
+
+    assert totals == initial
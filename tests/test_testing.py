@@ -0,0 +1,197 @@
+"""Tests for nextdns fake API server."""
+
+import asyncio
+from collections.abc import AsyncGenerator
+from datetime import UTC, datetime
+from http import HTTPStatus
+from time import perf_counter
+from unittest.mock import patch
+
+import aiohttp
+import pytest
+import pytest_asyncio
+
+from nextdns import ApiError, InvalidApiKeyError, NextDns, RateLimiter
+from nextdns.const import ATTR_BLOCK_PAGE, ATTR_WEB3
+from nextdns.model import ParentalControlServicesAttrs
+from nextdns.testing import FakeNextDnsServer
+
+PROFILE_ID = "fakepr"
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def server() -> AsyncGenerator[FakeNextDnsServer]:
+    """Run a fake API server with a profile."""
+    async with FakeNextDnsServer(api_key="fakeapikey", seed=1) as server:
+        server.add_profile(PROFILE_ID, "Fake Profile", "fakeprofile12")
+        yield server
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def session(
+    server: FakeNextDnsServer,
+) -> AsyncGenerator[aiohttp.ClientSession]:
+    """Return a session sending the API requests to the fake server."""
+    async with server.session() as session:
+        yield session
+
+
+@pytest.mark.asyncio
+async def test_settings(
+    server: FakeNextDnsServer, session: aiohttp.ClientSession
+) -> None:
+    """Test that changed settings are returned with the profile."""
+    nextdns = await NextDns.create(session, "fakeapikey")
+
+    assert nextdns.get_profile_id("Fake Profile") == PROFILE_ID
+    settings = await nextdns.get_settings(PROFILE_ID)
+    assert settings.block_page is False
+    assert settings.web3 is False
+
+    assert await nextdns.set_settings(
+        PROFILE_ID, {ATTR_BLOCK_PAGE: True, ATTR_WEB3: True}
+    )
+    assert await nextdns.set_logs_retention(PROFILE_ID, 24)
+
+    settings = await nextdns.get_settings(PROFILE_ID)
+    assert settings.block_page is True
+    assert settings.web3 is True
+    assert settings.logs_retention == 24
+    assert server.profiles[PROFILE_ID]["settings"]["logs"]["retention"] == 86400
+
+
+@pytest.mark.asyncio
+async def test_parental_control_service(
+    server: FakeNextDnsServer, session: aiohttp.ClientSession
+) -> None:
+    """Test that a missing service is added and then toggled."""
+    nextdns = await NextDns.create(session, "fakeapikey")
+    setting = ParentalControlServicesAttrs.BLOCK_TIKTOK
+
+    assert await nextdns.set_setting(PROFILE_ID, setting, True)
+    assert server.profiles[PROFILE_ID]["parentalControl"]["services"] == [
+        {"active": True, "recreation": False, "id": "tiktok"}
+    ]
+    assert (await nextdns.get_settings(PROFILE_ID)).block_tiktok is True
+
+    assert await nextdns.set_setting(PROFILE_ID, setting, False)
+    assert (await nextdns.get_settings(PROFILE_ID)).block_tiktok is False
+
+
+@pytest.mark.asyncio
+async def test_invalid_api_key(session: aiohttp.ClientSession) -> None:
+    """Test that a request with another API key is rejected."""
+    with pytest.raises(InvalidApiKeyError):
+        await NextDns.create(session, "otherapikey")
+
+
+@pytest.mark.asyncio
+async def test_injected_errors(
+    server: FakeNextDnsServer, session: aiohttp.ClientSession
+) -> None:
+    """Test the injected HTTP 429 and 524 responses."""
+    nextdns = await NextDns.create(session, "fakeapikey")
+    limited = await NextDns.create(session, "fakeapikey", rate_limiter=RateLimiter(100))
+
+    server.inject(HTTPStatus.TOO_MANY_REQUESTS)
+    with pytest.raises(ApiError, match="Too many requests"):
+        await nextdns.get_profile(PROFILE_ID)
+
+    server.inject(HTTPStatus.TOO_MANY_REQUESTS)
+    with patch.object(limited._rate_limiter, "pause") as pause_mock:  # noqa: SLF001
+        profile = await limited.get_profile(PROFILE_ID)
+    assert profile.id == PROFILE_ID
+    pause_mock.assert_called_once_with(1)
+
+    server.inject(524, count=2)
+    with patch("asyncio.sleep") as sleep_mock:
+        profile = await nextdns.get_profile(PROFILE_ID)
+    assert profile.id == PROFILE_ID
+    assert sleep_mock.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_latency() -> None:
+    """Test that responses are delayed by the latency."""
+    async with FakeNextDnsServer(latency=0.05) as server:
+        server.add_profile(PROFILE_ID, "Fake Profile")
+        async with server.session() as session:
+            start = perf_counter()
+            await NextDns.create(session, "fakeapikey")
+
+    assert perf_counter() - start >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_logs(server: FakeNextDnsServer, session: aiohttp.ClientSession) -> None:
+    """Test the generated logs and their analytics."""
+    server.generate_logs(PROFILE_ID, 250)
+    nextdns = await NextDns.create(session, "fakeapikey")
+
+    entries = [entry async for entry in nextdns.iter_logs(PROFILE_ID, limit=100)]
+    blocked = [entry async for entry in nextdns.iter_logs(PROFILE_ID, status="blocked")]
+    downloaded = [entry async for entry in nextdns.iter_log_entries(PROFILE_ID)]
+    analytics = await nextdns.get_all_analytics(PROFILE_ID)
+    series = await nextdns.get_analytics_series(
+        PROFILE_ID, "status", date_from="-1d", interval=3600
+    )
+
+    assert len(entries) == 250
+    assert entries[0].timestamp > entries[-1].timestamp
+    assert downloaded == entries
+    assert all(entry.status == "blocked" for entry in blocked)
+    assert analytics.status.blocked_queries == len(blocked)
+    assert (
+        analytics.status.default_queries
+        + analytics.status.blocked_queries
+        + analytics.status.allowed_queries
+        == 250
+    )
+    assert (
+        analytics.protocols.doh_queries
+        + analytics.protocols.doh3_queries
+        + analytics.protocols.doq_queries
+        + analytics.protocols.dot_queries
+        + analytics.protocols.tcp_queries
+        + analytics.protocols.udp_queries
+        == 250
+    )
+    assert len(series) == 25
+    assert sum(series.queries["blocked_queries"]) == len(blocked)
+
+    assert await nextdns.clear_logs(PROFILE_ID)
+    assert [entry async for entry in nextdns.iter_logs(PROFILE_ID)] == []
+
+
+@pytest.mark.asyncio
+async def test_stream_logs(
+    server: FakeNextDnsServer, session: aiohttp.ClientSession
+) -> None:
+    """Test that new logs are streamed."""
+    server.generate_logs(PROFILE_ID, 5)
+    nextdns = await NextDns.create(session, "fakeapikey")
+    stream = nextdns.stream_logs(PROFILE_ID)
+
+    async def read() -> list[int]:
+        return [(await anext(stream)).timestamp for _ in range(3)]
+
+    reader = asyncio.create_task(read())
+    # Let the stream connect before the logs are added
+    while server.requests < 2:  # noqa: ASYNC110
+        await asyncio.sleep(0.01)
+    server.generate_logs(PROFILE_ID, 3, start=datetime(2026, 1, 1, tzinfo=UTC))
+    timestamps = await asyncio.wait_for(reader, 5)
+    await stream.aclose()
+
+    assert timestamps == [1767225600000000, 1767225601000000, 1767225602000000]
+
+
+@pytest.mark.asyncio
+async def test_connection_status(session: aiohttp.ClientSession) -> None:
+    """Test the connection status of the profile."""
+    nextdns = await NextDns.create(session, "fakeapikey")
+
+    status = await nextdns.connection_status(PROFILE_ID)
+
+    assert status.connected is True
+    assert status.profile_id == PROFILE_ID